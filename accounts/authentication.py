@@ -0,0 +1,88 @@
+"""
+JWT authentication that resolves the user from an in-process cache.
+
+A verified access token still needs its user loaded to check that the
+account exists and is active. ``CachedJWTAuthentication`` keeps the
+concrete field values of recently seen users for
+``JWT_USER_CACHE_TIMEOUT`` seconds and builds a fresh ``CustomUser`` from
+them, so authenticated requests skip that query. With
+``JWT_USER_CACHE_PROFILE`` the user's ``Profile`` is cached alongside.
+
+Saving or deleting a user or profile drops its entry in this process
+(see ``accounts.signals``); other processes notice within the timeout.
+"""
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from edux.cache import TTLCache
+from .models import CustomUser, Profile
+
+users = TTLCache("jwt_users", settings.JWT_USER_CACHE_SIZE, settings.JWT_USER_CACHE_TIMEOUT)
+
+USER_FIELDS = [field.attname for field in CustomUser._meta.concrete_fields]
+PROFILE_FIELDS = [field.attname for field in Profile._meta.concrete_fields]
+
+
+def forget_user(user_id):
+    users.delete(str(user_id))
+
+
+def load_user(user_id):
+    """
+    The field values cached for ``user_id``: a dict of user values and,
+    with ``JWT_USER_CACHE_PROFILE``, the profile values under ``profile``
+    (None when the user has none). Returns None for unknown users.
+    """
+    queryset = CustomUser.objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+    if not settings.JWT_USER_CACHE_PROFILE:
+        return queryset.values(*USER_FIELDS).first()
+    user = queryset.select_related("profile").first()
+    if user is None:
+        return None
+    values = {name: getattr(user, name) for name in USER_FIELDS}
+    profile = getattr(user, "profile", None)
+    values["profile"] = None if profile is None else {name: getattr(profile, name) for name in PROFILE_FIELDS}
+    return values
+
+
+def build_user(values):
+    user = CustomUser.from_db(DEFAULT_DB_ALIAS, USER_FIELDS, [values[name] for name in USER_FIELDS])
+    if "profile" in values:
+        profile = values["profile"]
+        if profile is not None:
+            profile = Profile.from_db(DEFAULT_DB_ALIAS, PROFILE_FIELDS, [profile[name] for name in PROFILE_FIELDS])
+            Profile.user.field.set_cached_value(profile, user)
+        # A cached None makes ``user.profile`` raise DoesNotExist as usual.
+        CustomUser.profile.related.set_cached_value(user, profile)
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        key = str(user_id)
+        values = users.get(key)
+        if values is None:
+            values = load_user(user_id)
+            if values is None:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            users.set(key, values)
+        user = build_user(values)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
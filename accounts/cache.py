@@ -0,0 +1,28 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+def profile_key(user_id):
+    return f"accounts:profile:{user_id}"
+
+
+def get_profile(user_id):
+    """
+    The cached ``(etag, data)`` representation of a user's profile, or None.
+    """
+    return cache.get(profile_key(user_id))
+
+
+def set_profile(user_id, data):
+    body = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+    etag = f'"{hashlib.md5(body.encode()).hexdigest()}"'
+    cache.set(profile_key(user_id), (etag, data), settings.USER_PROFILE_CACHE_TIMEOUT)
+    return etag, data
+
+
+def forget_profile(user_id):
+    cache.delete(profile_key(user_id))
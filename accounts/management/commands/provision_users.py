@@ -0,0 +1,38 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from accounts.provisioning import provision_users
+from edux.rows import detect_format, read_rows
+
+
+class Command(BaseCommand):
+    help = "Create user accounts with profiles in bulk from a CSV or JSONL file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to read, or - for stdin.")
+        parser.add_argument("--format", choices=["csv", "jsonl"], help="Defaults to the file extension.")
+        parser.add_argument("--batch-size", type=int, default=500, help="Rows per transaction.")
+        parser.add_argument("--workers", type=int, help="Password hashing processes; defaults to the CPU count.")
+
+    def handle(self, *args, **options):
+        fmt = detect_format(options["path"], options["format"])
+
+        def progress(rows, rate):
+            self.stdout.write(f"{rows} rows ({rate:.0f} rows/s)")
+
+        def run(stream):
+            return provision_users(read_rows(stream, fmt), options["batch_size"], options["workers"], progress)
+
+        if options["path"] == "-":
+            stats = run(sys.stdin)
+        else:
+            with open(options["path"], newline="", encoding="utf-8") as stream:
+                stats = run(stream)
+
+        for line, error in stats["errors"]:
+            self.stderr.write(f"row {line}: {error}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats['rows']} rows in {stats['elapsed']:.2f}s: "
+            f"{stats['created']} created, {len(stats['errors'])} skipped"
+        ))
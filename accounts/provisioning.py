@@ -0,0 +1,190 @@
+"""
+Bulk creation of user accounts from CSV or JSONL.
+
+Each row needs ``email`` and ``password`` and may carry ``first_name``,
+``last_name`` and ``bio``. Password hashing is deliberately slow, so it
+runs on a process pool, one chunk at a time. Each chunk is then inserted
+with one ``bulk_create`` for users and one for profiles inside a single
+transaction. A bad row is reported with its line number and never aborts
+the rest of the batch.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+from edux.rows import RowError
+from .models import CustomUser, Profile
+
+USER_FIELDS = ["first_name", "last_name"]
+
+
+def text(row, field):
+    # Values must be strings: a JSON number or list is a bad row, not a 500.
+    value = row.get(field)
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        raise RowError(f"{field} must be a string")
+    if "\x00" in value:
+        # PostgreSQL text cannot store it.
+        raise RowError(f"{field} contains a NUL character")
+    return value
+
+
+def clean_row(row):
+    if isinstance(row, RowError):
+        raise row
+    email = CustomUser.objects.normalize_email(text(row, "email").strip())
+    password = text(row, "password")
+    if not email:
+        raise RowError("email is required")
+    if not password:
+        raise RowError("password is required")
+    if len(email) > CustomUser._meta.get_field("email").max_length:
+        raise RowError("email is too long")
+    try:
+        validate_email(email)
+    except ValidationError:
+        raise RowError("email is not valid")
+
+    cleaned = {"email": email, "password": password, "bio": text(row, "bio")}
+    for field in USER_FIELDS:
+        value = text(row, field).strip()
+        if len(value) > CustomUser._meta.get_field(field).max_length:
+            raise RowError(f"{field} is too long")
+        cleaned[field] = value
+    try:
+        validate_password(password, CustomUser(email=email, first_name=cleaned["first_name"],
+                                               last_name=cleaned["last_name"]))
+    except ValidationError as exc:
+        raise RowError(" ".join(exc.messages))
+    return cleaned
+
+
+def hashing_pool(workers):
+    # Spawn rather than fork, since the caller may be a threaded web worker.
+    # Spawned processes start without Django configured, and only objects
+    # importable before setup (make_password, django.setup) are sent to them.
+    return ProcessPoolExecutor(max_workers=workers,
+                               mp_context=multiprocessing.get_context("spawn"),
+                               initializer=django.setup)
+
+
+def insert_users(rows):
+    """
+    Create users and profiles for ``rows`` ({line: cleaned}) in one
+    transaction. Returns the number created and per-line errors.
+    """
+    users = [
+        CustomUser(email=row["email"], password=row["password"],
+                   **{field: row[field] for field in USER_FIELDS})
+        for row in rows.values()
+    ]
+    try:
+        with transaction.atomic():
+            users = CustomUser.objects.bulk_create(users)
+            Profile.objects.bulk_create([
+                Profile(user=user, bio=row["bio"]) for user, row in zip(users, rows.values())
+            ])
+        return len(users), []
+    except IntegrityError:
+        # Someone registered one of these emails meanwhile; insert row by
+        # row so only the conflicting rows fail.
+        pass
+
+    created, errors = 0, []
+    for line, row in rows.items():
+        try:
+            with transaction.atomic():
+                user = CustomUser.objects.create(
+                    email=row["email"], password=row["password"],
+                    **{field: row[field] for field in USER_FIELDS},
+                )
+                Profile.objects.create(user=user, bio=row["bio"])
+            created += 1
+        except IntegrityError:
+            errors.append((line, "email is already registered"))
+    return created, errors
+
+
+_shared = {"pid": None, "pool": None}
+_shared_lock = threading.Lock()
+
+
+def shared_hashing_pool():
+    """
+    A process-wide pool of ``PROVISION_API_WORKERS`` processes for web
+    requests, so an upload neither pays for starting Django in fresh
+    processes nor starts ``cpu_count()`` of them per request.
+    """
+    with _shared_lock:
+        if _shared["pid"] != os.getpid():
+            _shared.update(pid=os.getpid(), pool=hashing_pool(settings.PROVISION_API_WORKERS))
+        return _shared["pool"]
+
+
+def provision_users(rows, batch_size=500, workers=None, progress=None, pool=None):
+    """
+    Create accounts for ``(line_number, row)`` pairs, hashing passwords on
+    ``pool`` (of ``workers`` processes) or, without one, on a pool started
+    for this call.
+
+    Returns ``{"rows", "created", "errors", "elapsed"}``, where ``errors``
+    is a list of ``(line_number, message)``.
+    """
+    workers = workers or os.cpu_count() or 1
+    if pool is None:
+        with hashing_pool(workers) as pool:
+            return provision_users(rows, batch_size, workers, progress, pool)
+
+    stats = {"rows": 0, "created": 0, "errors": [], "elapsed": 0.0}
+    started = time.monotonic()
+    seen = set()
+    rows = iter(rows)
+    while chunk := list(islice(rows, batch_size)):
+        stats["rows"] += len(chunk)
+        cleaned = {}
+        for line, row in chunk:
+            try:
+                row = clean_row(row)
+            except RowError as exc:
+                stats["errors"].append((line, str(exc)))
+                continue
+            if row["email"] in seen:
+                stats["errors"].append((line, "email appears earlier in the file"))
+                continue
+            seen.add(row["email"])
+            cleaned[line] = row
+
+        existing = set(CustomUser.objects.filter(
+            email__in=[row["email"] for row in cleaned.values()],
+        ).values_list("email", flat=True))
+        for line in [line for line, row in cleaned.items() if row["email"] in existing]:
+            stats["errors"].append((line, "email is already registered"))
+            del cleaned[line]
+
+        passwords = [row["password"] for row in cleaned.values()]
+        chunksize = max(1, len(passwords) // (4 * workers))
+        for row, hashed in zip(cleaned.values(), pool.map(make_password, passwords, chunksize=chunksize)):
+            row["password"] = hashed
+
+        created, errors = insert_users(cleaned)
+        stats["created"] += created
+        stats["errors"].extend(errors)
+        stats["elapsed"] = time.monotonic() - started
+        if progress is not None:
+            progress(stats["rows"], stats["rows"] / max(stats["elapsed"], 1e-9))
+    stats["errors"].sort()
+    stats["elapsed"] = time.monotonic() - started
+    return stats
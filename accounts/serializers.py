@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from edux.metrics import TimedSerializerMixin
 from .models import CustomUser, Profile
 
 
@@ -8,7 +9,7 @@ class ProfileSerializer(serializers.ModelSerializer):
         fields = ["bio", "avatar"]
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     profile = ProfileSerializer()
     password = serializers.CharField(write_only=True)
 
@@ -25,3 +26,9 @@ class UserSerializer(serializers.ModelSerializer):
 
         Profile.objects.create(user=user, **profile_data)
         return user
+
+    def update(self, instance, validated_data):
+        password = validated_data.pop("password", None)
+        if password:
+            instance.set_password(password)
+        return super().update(instance, validated_data)
@@ -0,0 +1,36 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from rest_framework_simplejwt.settings import api_settings
+
+from .authentication import forget_user
+from .cache import forget_profile
+from .models import CustomUser, Profile
+
+
+def forget(user_id, pk):
+    forget_user(user_id)
+    forget_profile(pk)
+
+
+def user_changed(sender, instance, **kwargs):
+    user_id, pk = getattr(instance, api_settings.USER_ID_FIELD), instance.pk
+    forget(user_id, pk)
+    # A request may have cached the old row while the transaction was still
+    # open, so drop the entries again once the change is visible.
+    transaction.on_commit(lambda: forget(user_id, pk))
+
+
+def profile_changed(sender, instance, **kwargs):
+    if api_settings.USER_ID_FIELD == CustomUser._meta.pk.attname:
+        user_id = instance.user_id
+    else:
+        user_id = getattr(instance.user, api_settings.USER_ID_FIELD)
+    pk = instance.user_id
+    forget(user_id, pk)
+    transaction.on_commit(lambda: forget(user_id, pk))
+
+
+post_save.connect(user_changed, sender=CustomUser)
+post_delete.connect(user_changed, sender=CustomUser)
+post_save.connect(profile_changed, sender=Profile)
+post_delete.connect(profile_changed, sender=Profile)
@@ -1,3 +1,63 @@
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+
 from django.test import TestCase
 
-# Create your tests here.
+from edux.rows import read_rows
+from .models import CustomUser
+from .provisioning import provision_users
+
+PASSWORD = "Quiet-Harbor-42"
+
+
+def jsonl(*rows):
+    return io.StringIO("\n".join(json.dumps(row) for row in rows))
+
+
+class ProvisionUsersTests(TestCase):
+    def provision(self, stream, fmt="jsonl"):
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            return provision_users(read_rows(stream, fmt), batch_size=2, workers=1, pool=pool)
+
+    def test_creates_users_with_hashed_passwords(self):
+        stats = self.provision(jsonl(
+            {"email": "one@example.com", "password": PASSWORD, "first_name": "One"},
+            {"email": "two@example.com", "password": PASSWORD, "bio": "Hello"},
+            {"email": "three@example.com", "password": PASSWORD},
+        ))
+        self.assertEqual((stats["rows"], stats["created"], stats["errors"]), (3, 3, []))
+        user = CustomUser.objects.get(email="one@example.com")
+        self.assertTrue(user.check_password(PASSWORD))
+        self.assertEqual(user.first_name, "One")
+        self.assertEqual(CustomUser.objects.get(email="two@example.com").profile.bio, "Hello")
+
+    def test_bad_rows_are_reported_by_line(self):
+        stats = self.provision(jsonl(
+            {"email": 5, "password": PASSWORD},
+            {"email": "list@example.com", "password": ["x"]},
+            {"email": "name@example.com", "password": PASSWORD, "first_name": 7},
+            [1, 2],
+            {"email": "nul\x00@example.com", "password": PASSWORD},
+            {"email": "ok@example.com", "password": PASSWORD},
+            {"email": "ok@example.com", "password": PASSWORD},
+        ))
+        self.assertEqual(stats["created"], 1)
+        self.assertEqual(stats["errors"], [
+            (1, "email must be a string"),
+            (2, "password must be a string"),
+            (3, "first_name must be a string"),
+            (4, "expected a JSON object"),
+            (5, "email contains a NUL character"),
+            (7, "email appears earlier in the file"),
+        ])
+
+    def test_malformed_csv_line_is_a_row_error(self):
+        stream = io.StringIO(
+            "email,password\n"
+            f'big@example.com,"{"x" * 200000}"\n'
+            f"ok@example.com,{PASSWORD}\n"
+        )
+        stats = self.provision(stream, "csv")
+        self.assertEqual(stats["created"], 1)
+        self.assertEqual([line for line, _ in stats["errors"]], [2])
@@ -1,8 +1,9 @@
 from django.urls import path
-from .views import RegisterUserView, user_profile
+from .views import BulkUserCreateView, RegisterUserView, user_profile
 
 
 urlpatterns = [
     path("register/", RegisterUserView.as_view(), name="register"),
     path("user/profile/", user_profile, name="user_profile"),
+    path("users/bulk/", BulkUserCreateView.as_view(), name="user-bulk-create"),
 ]
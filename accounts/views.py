@@ -1,10 +1,24 @@
-from rest_framework import generics, status
+import codecs
+import io
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.http import parse_etags
+from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes, parser_classes
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
-from .models import CustomUser
-from .serializers import UserSerializer, ProfileSerializer
+from rest_framework.views import APIView
+
+from edux.rows import detect_format, read_rows
+from .cache import get_profile, set_profile
+from .models import CustomUser, Profile
+from .provisioning import provision_users, shared_hashing_pool
+from .serializers import UserSerializer
+
+logger = logging.getLogger(__name__)
 
 
 class RegisterUserView(generics.CreateAPIView):
@@ -13,33 +27,78 @@ class RegisterUserView(generics.CreateAPIView):
     permission_classes = [AllowAny]
 
 
+class BulkUserCreateView(APIView):
+    """
+    Staff upload of a CSV or JSONL ``file`` of accounts to create; see
+    ``accounts.provisioning`` for the columns. Rows that fail are listed
+    with their line number and do not stop the others.
+    """
+    permission_classes = [permissions.IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"file": ["This field is required."]}, status=status.HTTP_400_BAD_REQUEST)
+        fmt = detect_format(upload.name, request.data.get("format"))
+        if fmt not in ("csv", "jsonl"):
+            return Response({"format": ["Choose csv or jsonl."]}, status=status.HTTP_400_BAD_REQUEST)
+        # Check the encoding before anything is inserted, rather than
+        # failing halfway through with earlier chunks already committed.
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        try:
+            for data in upload.chunks():
+                decoder.decode(data)
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            return Response({"file": ["The file must be UTF-8 encoded."]}, status=status.HTTP_400_BAD_REQUEST)
+        upload.seek(0)
+        stream = io.TextIOWrapper(upload, encoding="utf-8", newline="")
+        stats = provision_users(read_rows(stream, fmt), workers=settings.PROVISION_API_WORKERS,
+                                pool=shared_hashing_pool())
+        return Response({
+            "rows": stats["rows"],
+            "created": stats["created"],
+            "errors": [{"line": line, "error": error} for line, error in stats["errors"]],
+        })
+
+
 @api_view(["GET", "PATCH"])
 @permission_classes([IsAuthenticated])
 @parser_classes([MultiPartParser, FormParser])
 def user_profile(request):
-    user = request.user  # current authenticated user
-
     if request.method == "GET":
-        serializer = UserSerializer(user)
-        return Response(serializer.data)
+        # The serialized profile is cached per user until the user or
+        # profile is saved (accounts.signals), and revalidated by ETag.
+        cached = get_profile(request.user.pk)
+        if cached is None:
+            # request.user may come from the authentication cache and lag
+            # behind the database, so what gets cached is read afresh.
+            user = CustomUser.objects.select_related("profile").get(pk=request.user.pk)
+            cached = set_profile(user.pk, UserSerializer(user).data)
+        etag, data = cached
+        if etag in parse_etags(request.META.get("HTTP_IF_NONE_MATCH", "")):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data)
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
 
-    elif request.method == "PATCH":
+    with transaction.atomic():
+        # request.user may come from the authentication cache, so lock and
+        # update the current row instead of saving possibly stale fields.
+        user = CustomUser.objects.select_for_update().get(pk=request.user.pk)
         user_serializer = UserSerializer(user, data=request.data, partial=True)
-
-        if user_serializer.is_valid():
-            print(user_serializer.validated_data)
-            profile_data = user_serializer.validated_data.pop("profile", {})
-            user_serializer.save()
-
-            if profile_data:
-                profile_serializer = ProfileSerializer(
-                    user.profile, data=profile_data, partial=True
-                )
-                if profile_serializer.is_valid():
-                    profile_serializer.save()
-                else:
-                    return Response(profile_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-
-            return Response(user_serializer.data)
-
-        return Response(user_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        if not user_serializer.is_valid():
+            return Response(user_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        logger.debug("Profile update for user %s: %s", user.pk, sorted(user_serializer.validated_data))
+        profile_data = user_serializer.validated_data.pop("profile", {})
+        user_serializer.save()
+        profile, _ = Profile.objects.get_or_create(user=user)
+        if profile_data:
+            for attr, value in profile_data.items():
+                setattr(profile, attr, value)
+            profile.save()
+        CustomUser.profile.related.set_cached_value(user, profile)
+        return Response(UserSerializer(user).data)
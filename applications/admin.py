@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Application
+from .models import Application, DocumentBlob, RecommendationJob
 
 
 @admin.register(Application)
@@ -17,3 +17,16 @@ class ApplicationAdmin(admin.ModelAdmin):
 
     search_fields = ("user__email", "university__name")
     list_filter = ("prior_highest_education",)
+
+
+@admin.register(DocumentBlob)
+class DocumentBlobAdmin(admin.ModelAdmin):
+    list_display = ("id", "sha256", "size", "file", "created_at")
+    search_fields = ("sha256",)
+
+
+@admin.register(RecommendationJob)
+class RecommendationJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "status", "attempts", "created_at", "finished_at")
+    search_fields = ("user__email",)
+    list_filter = ("status",)
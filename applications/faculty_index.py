@@ -0,0 +1,133 @@
+"""
+TF-IDF index of the faculty catalog for local recommendations.
+
+Each faculty is a document made of its name (weighted double) and its
+university's name and location. Terms are whole words plus character
+4-grams, so "robot" still meets "Robotics". The index is an inverted
+list of NumPy arrays: scoring a query sums the postings of its terms with
+one ``bincount`` and takes the top k with ``argpartition``.
+
+Tokenized documents are kept between builds, so a catalog change only
+re-tokenizes the faculties whose text changed before the arrays are
+recomputed.
+"""
+import math
+import re
+import threading
+from collections import Counter
+
+import numpy as np
+
+from universities.models import Faculty
+
+WORD_RE = re.compile(r"\w+")
+STOP_WORDS = frozenset(
+    "a an and at for i im in is it me my of on or that the to with".split()
+)
+NGRAM = 4
+
+
+def tokenize(text):
+    terms = Counter()
+    for word in WORD_RE.findall(text.lower()):
+        if word in STOP_WORDS:
+            continue
+        terms[word] += 1
+        padded = f"_{word}_"
+        for start in range(len(padded) - NGRAM + 1):
+            terms["#" + padded[start:start + NGRAM]] += 1
+    return terms
+
+
+def document_terms(name, university, location):
+    terms = tokenize(name)
+    for term in terms:
+        terms[term] *= 2
+    terms.update(tokenize(f"{university} {location}"))
+    return terms
+
+
+class FacultyIndex:
+    def __init__(self, rows, previous=None):
+        """
+        ``rows`` are (id, name, university name, location) tuples; terms of
+        rows unchanged since ``previous`` are reused.
+        """
+        known = previous.documents if previous is not None else {}
+        self.documents = {}
+        self.labels = []
+        for pk, name, university, location in rows:
+            signature = (name, university, location)
+            document = known.get(pk)
+            if document is None or document[0] != signature:
+                document = (signature, document_terms(name, university, location))
+            self.documents[pk] = document
+            self.labels.append(f"{name} of {university}")
+
+        self.vocabulary = {}
+        term_ids, doc_ids, counts = [], [], []
+        for doc, (_, terms) in enumerate(self.documents.values()):
+            for term, count in terms.items():
+                term_ids.append(self.vocabulary.setdefault(term, len(self.vocabulary)))
+                doc_ids.append(doc)
+                counts.append(count)
+        term_ids = np.asarray(term_ids, dtype=np.int32)
+        doc_ids = np.asarray(doc_ids, dtype=np.int32)
+        counts = np.asarray(counts, dtype=np.float32)
+
+        size = len(self.labels)
+        document_frequency = np.bincount(term_ids, minlength=len(self.vocabulary))
+        self.idf = (np.log((1 + size) / (1 + document_frequency)) + 1).astype(np.float32)
+        weights = (1 + np.log(counts)) * self.idf[term_ids]
+        norms = np.sqrt(np.bincount(doc_ids, weights=weights ** 2, minlength=size))
+        weights /= norms[doc_ids]
+
+        order = np.argsort(term_ids, kind="stable")
+        self.doc_ids = doc_ids[order]
+        self.weights = weights[order].astype(np.float32)
+        self.offsets = np.zeros(len(self.vocabulary) + 1, dtype=np.int64)
+        np.cumsum(document_frequency, out=self.offsets[1:])
+
+    def search(self, text, k):
+        """
+        Return up to ``k`` (label, score) pairs by cosine similarity.
+        """
+        query = [(self.vocabulary[term], count) for term, count in tokenize(text).items()
+                 if term in self.vocabulary]
+        if not query or not self.labels:
+            return []
+        weights = {term: (1 + math.log(count)) * float(self.idf[term]) for term, count in query}
+        norm = math.sqrt(sum(weight ** 2 for weight in weights.values()))
+
+        postings = [(self.offsets[term], self.offsets[term + 1], weight / norm)
+                    for term, weight in weights.items()]
+        doc_ids = np.concatenate([self.doc_ids[start:end] for start, end, _ in postings])
+        contributions = np.concatenate([self.weights[start:end] * weight for start, end, weight in postings])
+        scores = np.bincount(doc_ids, weights=contributions, minlength=len(self.labels))
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.labels[doc], float(scores[doc])) for doc in top if scores[doc] > 0]
+
+
+_lock = threading.Lock()
+_current = {"version": None, "index": None}
+
+
+def get_index(version):
+    """
+    The index for catalog ``version``, rebuilt from the previous one when
+    the version has moved on.
+    """
+    with _lock:
+        if _current["version"] == version:
+            return _current["index"]
+        previous = _current["index"]
+    rows = Faculty.objects.order_by("university_id", "id").values_list(
+        "id", "name", "university__name", "university__location",
+    )
+    index = FacultyIndex(rows, previous)
+    with _lock:
+        _current.update(version=version, index=index)
+    return index
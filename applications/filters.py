@@ -0,0 +1,27 @@
+from rest_framework import serializers
+
+from .models import Application
+
+
+class ApplicationFilterSerializer(serializers.Serializer):
+    """
+    Staff-side selection of applications, shared by the bulk status,
+    statistics and export endpoints.
+    """
+    university = serializers.IntegerField(required=False)
+    status = serializers.ChoiceField(choices=Application.ApplicationStatus.choices, required=False)
+    target_program = serializers.ChoiceField(choices=Application.TargetProgram.choices, required=False)
+    prior_highest_education = serializers.ChoiceField(choices=Application.PriorEducation.choices, required=False)
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+
+
+def filter_applications(queryset, params):
+    for field in ("university", "status", "target_program", "prior_highest_education"):
+        if field in params:
+            queryset = queryset.filter(**{field: params[field]})
+    if "created_after" in params:
+        queryset = queryset.filter(created_at__gte=params["created_after"])
+    if "created_before" in params:
+        queryset = queryset.filter(created_at__lt=params["created_before"])
+    return queryset
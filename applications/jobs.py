@@ -0,0 +1,97 @@
+"""
+Postgres-backed queue for recommendation jobs.
+
+Workers claim the oldest due job with ``SELECT ... FOR UPDATE SKIP
+LOCKED``, so any number of them can poll the same table without blocking
+each other. A claimed job carries a lease; if its worker dies, the job
+becomes claimable again once the lease expires. Failed attempts are
+retried with exponential backoff and jitter until
+``RECOMMEND_JOB_MAX_ATTEMPTS`` is reached.
+"""
+import logging
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import RecommendationJob
+from .recommend import recommend
+
+logger = logging.getLogger(__name__)
+
+Status = RecommendationJob.Status
+
+
+def retry_delay(attempts):
+    """
+    Seconds to wait before attempt ``attempts + 1``: doubling from
+    ``RECOMMEND_JOB_RETRY_DELAY`` up to ``RECOMMEND_JOB_RETRY_MAX_DELAY``,
+    with full jitter so failed jobs do not retry in lockstep.
+    """
+    ceiling = min(settings.RECOMMEND_JOB_RETRY_MAX_DELAY,
+                  settings.RECOMMEND_JOB_RETRY_DELAY * 2 ** (attempts - 1))
+    return random.uniform(ceiling / 2, ceiling)
+
+
+def claim_job():
+    """
+    Lease the next due job to the calling worker, or return None.
+
+    A job whose lease expired on its last allowed attempt is marked
+    failed instead: its worker died, or hung, with no retries left.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        while True:
+            job = (
+                RecommendationJob.objects.select_for_update(skip_locked=True)
+                .filter(Q(status=Status.QUEUED, run_after__lte=now)
+                        | Q(status=Status.RUNNING, locked_until__lt=now))
+                .order_by("run_after")
+                .first()
+            )
+            if job is None:
+                return None
+            if job.status == Status.QUEUED or job.attempts < settings.RECOMMEND_JOB_MAX_ATTEMPTS:
+                break
+            logger.error("Recommendation job %s lost its lease after %s attempts", job.pk, job.attempts)
+            job.status = Status.FAILED
+            job.error = "The worker running the last attempt stopped before finishing."
+            job.locked_until = None
+            job.finished_at = now
+            job.save(update_fields=["status", "error", "locked_until", "finished_at"])
+        job.status = Status.RUNNING
+        job.attempts += 1
+        job.locked_until = now + timedelta(seconds=settings.RECOMMEND_JOB_LEASE)
+        job.save(update_fields=["status", "attempts", "locked_until"])
+    return job
+
+
+def finish(job, **fields):
+    # Only the worker holding the current lease may record an outcome; a
+    # worker whose lease expired and was reclaimed changes nothing.
+    return RecommendationJob.objects.filter(
+        pk=job.pk, status=Status.RUNNING, attempts=job.attempts,
+    ).update(locked_until=None, **fields)
+
+
+def run_job(job):
+    try:
+        result = recommend(job.interested_in, job.good_at)
+    except Exception as exc:
+        now = timezone.now()
+        if job.attempts >= settings.RECOMMEND_JOB_MAX_ATTEMPTS:
+            logger.exception("Recommendation job %s failed after %s attempts", job.pk, job.attempts)
+            finish(job, status=Status.FAILED, error=str(exc) or exc.__class__.__name__, finished_at=now)
+        else:
+            delay = retry_delay(job.attempts)
+            logger.warning("Recommendation job %s attempt %s failed, retrying in %.1fs: %r",
+                           job.pk, job.attempts, delay, exc)
+            finish(job, status=Status.QUEUED, error=str(exc) or exc.__class__.__name__,
+                   run_after=now + timedelta(seconds=delay))
+        return False
+    finish(job, status=Status.SUCCEEDED, result=result, error="", finished_at=timezone.now())
+    return True
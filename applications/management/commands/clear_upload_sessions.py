@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from applications.models import UploadSession
+from applications.uploads import discard_chunks
+
+
+class Command(BaseCommand):
+    help = "Delete unfinished upload sessions and their chunks after a grace period."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=24, help="Age after which a pending session is abandoned.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options["hours"])
+        stale = UploadSession.objects.filter(status=UploadSession.Status.PENDING, created_at__lt=cutoff)
+        count = 0
+        for session in stale.iterator():
+            discard_chunks(session)
+            session.delete()
+            count += 1
+        self.stdout.write(f"Removed {count} abandoned upload session(s)")
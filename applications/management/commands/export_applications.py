@@ -0,0 +1,43 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from applications.export import CONTENT_TYPES, iter_export
+from applications.filters import ApplicationFilterSerializer
+
+
+class Command(BaseCommand):
+    help = "Stream applications with applicant email and university name to CSV or JSONL."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to write, or - for stdout.")
+        parser.add_argument("--format", choices=sorted(CONTENT_TYPES), default="csv")
+        parser.add_argument("--university", type=int)
+        parser.add_argument("--status")
+        parser.add_argument("--target-program")
+        parser.add_argument("--prior-highest-education")
+        parser.add_argument("--created-after", help="ISO 8601 date or datetime.")
+        parser.add_argument("--created-before", help="ISO 8601 date or datetime.")
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Rows fetched per cursor round trip.")
+
+    def handle(self, *args, **options):
+        filters = {
+            field: options[field]
+            for field in ApplicationFilterSerializer().fields
+            if options.get(field) is not None
+        }
+        serializer = ApplicationFilterSerializer(data=filters)
+        if not serializer.is_valid():
+            raise CommandError(serializer.errors)
+
+        started = time.monotonic()
+        pieces = iter_export(serializer.validated_data, options["format"], options["chunk_size"])
+        if options["path"] == "-":
+            for piece in pieces:
+                sys.stdout.write(piece)
+        else:
+            with open(options["path"], "w", newline="", encoding="utf-8") as stream:
+                for piece in pieces:
+                    stream.write(piece)
+        self.stderr.write(self.style.SUCCESS(f"Export finished in {time.monotonic() - started:.2f}s"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from applications.statistics import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the application statistics summary table from scratch to repair drift."
+
+    def handle(self, *args, **options):
+        rows = rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} statistics row(s)"))
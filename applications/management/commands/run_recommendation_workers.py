@@ -0,0 +1,62 @@
+import logging
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+
+from applications.jobs import claim_job, run_job
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Run a pool of worker threads that execute queued recommendation jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=4, help="Number of worker threads.")
+        parser.add_argument("--poll-interval", type=float, default=1.0,
+                            help="Seconds an idle worker waits before looking for work again.")
+        parser.add_argument("--once", action="store_true",
+                            help="Exit as soon as the queue has no due jobs.")
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+
+        def request_stop(signum, frame):
+            self.stdout.write("Stopping after the running jobs finish")
+            stop.set()
+
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+
+        threads = [
+            threading.Thread(target=self.work, args=(stop, options), name=f"recommendation-worker-{n}")
+            for n in range(options["threads"])
+        ]
+        for thread in threads:
+            thread.start()
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=0.5)
+        self.stdout.write("Workers stopped")
+
+    def work(self, stop, options):
+        try:
+            while not stop.is_set():
+                try:
+                    job = claim_job()
+                except DatabaseError:
+                    # Reconnect on the next round, e.g. after a database restart.
+                    logger.exception("Could not claim a recommendation job")
+                    connection.close()
+                    stop.wait(options["poll_interval"])
+                    continue
+                if job is None:
+                    if options["once"]:
+                        return
+                    stop.wait(options["poll_interval"])
+                    continue
+                run_job(job)
+        finally:
+            connection.close()
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0008_alter_application_prior_highest_education'),
+        ('universities', '0006_image_variants'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['user', '-created_at'], name='application_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_statistics(apps, schema_editor):
+    Application = apps.get_model('applications', 'Application')
+    ApplicationStatistic = apps.get_model('applications', 'ApplicationStatistic')
+    rows = (
+        Application.objects.order_by()
+        .values('university_id', 'status', 'target_program', 'prior_highest_education')
+        .annotate(count=models.Count('pk'))
+    )
+    ApplicationStatistic.objects.bulk_create(
+        [ApplicationStatistic(**row) for row in rows.iterator()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0011_university_status_index'),
+        ('universities', '0006_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationStatistic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('SUBMITTED', 'Submitted'), ('ACCEPTED', 'Accepted'), ('WHITE LISTED', 'Waitlisted'), ('UNDER REVIEW', 'Under Review'), ('REJECTED', 'Rejected')], max_length=32)),
+                ('target_program', models.CharField(choices=[('BACHELOR', 'Bachelor'), ('MASTER', 'Master'), ('PHD', 'PhD')], max_length=32)),
+                ('prior_highest_education', models.CharField(choices=[('NO EDUCATION', 'No Education'), ('MIDDLE SCHOOL', 'Middle School'), ('HIGH SCHOOL', 'High School'), ('BACHELOR', 'Bachelor'), ('MASTER', 'Master'), ('PHD', 'PhD')], max_length=32)),
+                ('count', models.IntegerField(default=0)),
+                ('university', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='application_statistics', to='universities.university')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('university', 'status', 'target_program', 'prior_highest_education'), name='application_statistic_unique')],
+            },
+        ),
+        migrations.RunPython(populate_statistics, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,9 @@
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from datetime import datetime
+import math
+import uuid
 
 
 class Application(models.Model):
@@ -43,3 +46,132 @@ class Application(models.Model):
     target_program = models.CharField(max_length=32,
                                choices=TargetProgram.choices,
                                default=TargetProgram.BACHELOR)
+
+    # Review workflow: which statuses each status may move to.
+    STATUS_TRANSITIONS = {
+        ApplicationStatus.SUBMITTED: {ApplicationStatus.UNDER_REVIEW},
+        ApplicationStatus.UNDER_REVIEW: {
+            ApplicationStatus.ACCEPTED,
+            ApplicationStatus.REJECTED,
+            ApplicationStatus.WHITE_LISTED,
+        },
+        ApplicationStatus.WHITE_LISTED: {
+            ApplicationStatus.ACCEPTED,
+            ApplicationStatus.REJECTED,
+        },
+    }
+
+    STATISTIC_FIELDS = ("university_id", "status", "target_program", "prior_highest_education")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "-created_at"], name="application_user_created_idx"),
+            models.Index(fields=["university", "status"], name="application_univ_status_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the statistics key the row had when loaded, so a later
+        # save knows which summary row to decrement without a query.
+        if set(cls.STATISTIC_FIELDS) <= set(field_names):
+            instance._statistic_key = tuple(getattr(instance, field) for field in cls.STATISTIC_FIELDS)
+        return instance
+
+
+class ApplicationStatistic(models.Model):
+    """
+    Running count of applications per university, status, target program
+    and prior education, kept in step with ``Application`` by
+    ``applications.statistics``.
+    """
+    university = models.ForeignKey('universities.University',
+                                   on_delete=models.CASCADE,
+                                   related_name='application_statistics')
+    status = models.CharField(max_length=32, choices=Application.ApplicationStatus.choices)
+    target_program = models.CharField(max_length=32, choices=Application.TargetProgram.choices)
+    prior_highest_education = models.CharField(max_length=32, choices=Application.PriorEducation.choices)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["university", "status", "target_program", "prior_highest_education"],
+                name="application_statistic_unique",
+            ),
+        ]
+
+
+class DocumentBlob(models.Model):
+    """
+    An uploaded document stored once under its SHA-256 digest; applications
+    point their file fields at ``file`` instead of storing a copy.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to='blobs/')
+    size = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+class UploadSession(models.Model):
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        COMPLETE = 'COMPLETE', 'Complete'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL,
+                             on_delete=models.CASCADE,
+                             related_name='upload_sessions')
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    sha256 = models.CharField(max_length=64)
+    chunk_size = models.IntegerField()
+    status = models.CharField(max_length=16,
+                              choices=Status.choices,
+                              default=Status.PENDING)
+    blob = models.ForeignKey(DocumentBlob,
+                             on_delete=models.SET_NULL,
+                             null=True,
+                             blank=True,
+                             related_name='upload_sessions')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @property
+    def total_chunks(self):
+        return math.ceil(self.size / self.chunk_size)
+
+
+class RecommendationJob(models.Model):
+    """
+    A queued faculty recommendation, executed by the
+    ``run_recommendation_workers`` command and polled by the client.
+    """
+    class Status(models.TextChoices):
+        QUEUED = 'QUEUED', 'Queued'
+        RUNNING = 'RUNNING', 'Running'
+        SUCCEEDED = 'SUCCEEDED', 'Succeeded'
+        FAILED = 'FAILED', 'Failed'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL,
+                             on_delete=models.CASCADE,
+                             related_name='recommendation_jobs')
+    interested_in = models.TextField(blank=True)
+    good_at = models.TextField(blank=True)
+    status = models.CharField(max_length=16,
+                              choices=Status.choices,
+                              default=Status.QUEUED)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default='')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # Earliest time a queued job may run; pushed back between retries.
+    run_after = models.DateTimeField(default=timezone.now)
+    # A running job whose lease has expired belongs to a dead worker.
+    locked_until = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="recommendation_job_queue_idx"),
+        ]
@@ -0,0 +1,12 @@
+from rest_framework.pagination import CursorPagination
+
+
+class ApplicationCursorPagination(CursorPagination):
+    """
+    Newest-first keyset pagination over an applicant's applications, served
+    by the (user, created_at) index.
+    """
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-created_at", "-id")
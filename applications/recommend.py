@@ -0,0 +1,393 @@
+"""
+Faculty recommendations for an applicant's free-text answers.
+
+``RECOMMEND_ENGINE`` picks the pipeline:
+
+* ``llm``: the model chooses from the whole catalog prompt;
+* ``local``: top matches from the TF-IDF index in ``faculty_index``;
+* ``local+llm``: the model re-ranks the local candidates, falling back to
+  the local order when the call fails.
+
+The catalog part of the prompt only changes when universities or
+faculties do, so it is rebuilt once per catalog version. Answers are
+cached per engine, normalised input and catalog version, so repeated
+questions skip the work entirely.
+
+``recommend()`` is the blocking entry point; ``arecommend()`` makes the
+model call on a shared async client, with at most
+``RECOMMEND_MAX_CONCURRENCY`` calls in flight per process.
+"""
+import asyncio
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing, contextmanager
+from functools import lru_cache
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from openai import AsyncOpenAI, OpenAI, OpenAIError
+
+from edux.cache import TTLCache
+from edux.metrics import timed
+from universities.cache import get_catalog_version
+from universities.models import Faculty
+from .faculty_index import get_index
+
+logger = logging.getLogger(__name__)
+
+ENGINES = ("llm", "local", "local+llm")
+if settings.RECOMMEND_ENGINE not in ENGINES:
+    raise ImproperlyConfigured(f"RECOMMEND_ENGINE must be one of {ENGINES}.")
+
+_catalog_lock = threading.Lock()
+_catalog = {"version": None, "labels": None, "prompt": None}
+
+answers = TTLCache("recommendations", settings.RECOMMEND_CACHE_SIZE, settings.RECOMMEND_CACHE_TIMEOUT)
+
+
+def normalize(text, prefix):
+    text = " ".join(text.lower().split())
+    return text.replace(prefix, "").strip(" .,;")
+
+
+def normalize_inputs(interested_in, good_at):
+    return (
+        normalize(interested_in, "i'm interested in"),
+        normalize(good_at, "i think i'm good at"),
+    )
+
+
+def catalog(version):
+    """
+    The "<faculty> of <university>" labels for ``version`` and their
+    comma-separated prompt text.
+    """
+    with _catalog_lock:
+        if _catalog["version"] == version:
+            return _catalog["labels"], _catalog["prompt"]
+    names = Faculty.objects.order_by("university_id", "id").values_list("name", "university__name")
+    labels = [f"{faculty} of {university}" for faculty, university in names]
+    prompt = ",".join(labels)
+    with _catalog_lock:
+        _catalog.update(version=version, labels=labels, prompt=prompt)
+    return labels, prompt
+
+
+def build_prompt(catalog, interested_in, good_at):
+    return (f'Here is the list of faculties of universities:\n{catalog}.\n'
+            f'If a person would say that he is good at:\n{good_at}\n'
+            f'And also if a person would be interested in:\n{interested_in}'
+            f'Choose exactly 5 of the faculties that would fit that person'
+            f' and return only them separated by comma')
+
+
+def build_rerank_prompt(candidates, interested_in, good_at):
+    return (f'Here is a list of candidate faculties of universities:\n{",".join(candidates)}.\n'
+            f'If a person would say that he is good at:\n{good_at}\n'
+            f'And also if a person would be interested in:\n{interested_in}\n'
+            f'Choose the {settings.RECOMMEND_RESULTS} of these faculties that fit that person best,'
+            f' best first, and return only them exactly as written, separated by comma')
+
+
+def parse_answer(text):
+    return [name.strip() for name in re.split(r"[,\n]", text) if name.strip()]
+
+
+class ModelBusy(Exception):
+    """
+    Every model call slot of this process is taken.
+    """
+
+
+@lru_cache(maxsize=None)
+def get_client():
+    # One client per process keeps its HTTP connection pool warm.
+    return OpenAI(timeout=settings.RECOMMEND_TIMEOUT)
+
+
+_async_client = {"loop": None, "client": None}
+
+# Counted across threads and event loops, so the limit holds per process
+# however the async views are run.
+_slots = threading.BoundedSemaphore(settings.RECOMMEND_MAX_CONCURRENCY)
+
+
+def get_async_client():
+    # The client's connections belong to the event loop that opened them.
+    # Under ASGI that is the worker's single loop; the async views refuse
+    # to run anywhere else (see applications.views).
+    loop = asyncio.get_running_loop()
+    if _async_client["loop"] is not loop:
+        _async_client.update(loop=loop, client=AsyncOpenAI(timeout=settings.RECOMMEND_TIMEOUT, max_retries=0))
+    return _async_client["client"]
+
+
+@contextmanager
+def model_slot():
+    """
+    Hold one of the ``RECOMMEND_MAX_CONCURRENCY`` model call slots, or
+    raise ``ModelBusy`` straight away when none is free.
+    """
+    if not _slots.acquire(blocking=False):
+        raise ModelBusy
+    try:
+        yield
+    finally:
+        _slots.release()
+
+
+def ask_model(prompt):
+    logger.debug("Recommendation prompt: %s", prompt)
+    with timed("llm"):
+        response = get_client().responses.create(model=settings.RECOMMEND_MODEL, input=prompt)
+    logger.debug("Recommendation answer: %s", response.output_text)
+    return parse_answer(response.output_text)
+
+
+async def ask_model_async(prompt):
+    """
+    Like ``ask_model`` but without blocking a thread. Raises ``ModelBusy``
+    straight away instead of queueing when all slots are in use, and
+    ``TimeoutError`` after ``RECOMMEND_TIMEOUT`` seconds.
+    """
+    client = get_async_client()
+    with model_slot():
+        logger.debug("Recommendation prompt: %s", prompt)
+        with timed("llm"):
+            async with asyncio.timeout(settings.RECOMMEND_TIMEOUT):
+                response = await client.responses.create(model=settings.RECOMMEND_MODEL, input=prompt)
+    logger.debug("Recommendation answer: %s", response.output_text)
+    return parse_answer(response.output_text)
+
+
+def local_matches(version, interested_in, good_at, k):
+    return [label for label, _ in get_index(version).search(f"{interested_in} {good_at}", k)]
+
+
+def rerank(candidates, answer):
+    """
+    Order ``candidates`` as the model did; names it invents are dropped and
+    any shortfall is filled from the local order.
+    """
+    allowed = {candidate.lower(): candidate for candidate in candidates}
+    ranked = list(dict.fromkeys(allowed[name.lower()] for name in answer if name.lower() in allowed))
+    ranked.extend(candidate for candidate in candidates if candidate not in ranked)
+    return ranked[:settings.RECOMMEND_RESULTS]
+
+
+class Recommendation:
+    """
+    A request resolved as far as possible without the model: ``result`` is
+    set when no model call is needed, otherwise ``prompt`` is what to ask.
+    ``candidates`` holds the local matches when the model only re-ranks,
+    and ``allowed`` the faculty labels a model answer may contain.
+    """
+
+    def __init__(self, key, result=None, prompt=None, candidates=None, allowed=None):
+        self.key = key
+        self.result = result
+        self.prompt = prompt
+        self.candidates = candidates
+        self.allowed = allowed if allowed is not None else candidates
+        self.error = None
+
+    def resolve(self, answer, cache=True):
+        result = answer if self.candidates is None else rerank(self.candidates, answer)
+        if cache:
+            answers.set(self.key, tuple(result))
+        return result
+
+    def fallback(self):
+        """
+        The result to use when the model is unavailable, or None when
+        there is nothing to fall back to.
+        """
+        if self.candidates is None:
+            return None
+        logger.warning("Re-ranking unavailable, using local order")
+        return self.candidates[:settings.RECOMMEND_RESULTS]
+
+
+def prepare(interested_in, good_at, version=None):
+    interested_in, good_at = normalize_inputs(interested_in, good_at)
+    engine = settings.RECOMMEND_ENGINE
+    if version is None:
+        version = get_catalog_version()
+    key = (engine, version, interested_in, good_at)
+    cached = answers.get(key)
+    if cached is not None:
+        return Recommendation(key, result=list(cached))
+
+    if engine == "llm":
+        labels, text = catalog(version)
+        return Recommendation(key, prompt=build_prompt(text, interested_in, good_at), allowed=labels)
+    if engine == "local":
+        result = local_matches(version, interested_in, good_at, settings.RECOMMEND_RESULTS)
+        answers.set(key, tuple(result))
+        return Recommendation(key, result=result)
+    candidates = local_matches(version, interested_in, good_at, settings.RECOMMEND_RERANK_CANDIDATES)
+    if not candidates:
+        return Recommendation(key, result=[])
+    return Recommendation(key, prompt=build_rerank_prompt(candidates, interested_in, good_at),
+                          candidates=candidates)
+
+
+def recommend(interested_in, good_at):
+    recommendation = prepare(interested_in, good_at)
+    if recommendation.result is not None:
+        return recommendation.result
+    try:
+        answer = ask_model(recommendation.prompt)
+    except OpenAIError:
+        result = recommendation.fallback()
+        if result is None:
+            raise
+        return result
+    return recommendation.resolve(answer)
+
+
+async def arecommend(interested_in, good_at):
+    recommendation = await sync_to_async(prepare)(interested_in, good_at)
+    if recommendation.result is not None:
+        return recommendation.result
+    try:
+        answer = await ask_model_async(recommendation.prompt)
+    except (OpenAIError, ModelBusy, TimeoutError):
+        result = recommendation.fallback()
+        if result is None:
+            raise
+        return result
+    return recommendation.resolve(answer)
+
+
+def settle(recommendation):
+    try:
+        recommendation.result = recommendation.resolve(ask_model(recommendation.prompt))
+    except OpenAIError as exc:
+        recommendation.result = recommendation.fallback()
+        if recommendation.result is None:
+            recommendation.error = exc
+    return recommendation
+
+
+def recommend_many(items):
+    """
+    Recommendations for many (interested_in, good_at) pairs, in input order.
+
+    Identical normalised inputs are answered once against one catalog
+    version, and the remaining model calls run on a pool of
+    ``RECOMMEND_BATCH_WORKERS`` threads. Each entry is the finished
+    ``Recommendation``; ``error`` is set where the model call failed.
+    """
+    version = get_catalog_version()
+    unique = {}
+    keys = []
+    for interested_in, good_at in items:
+        key = normalize_inputs(interested_in, good_at)
+        if key not in unique:
+            unique[key] = prepare(*key, version=version)
+        keys.append(key)
+
+    pending = [recommendation for recommendation in unique.values() if recommendation.result is None]
+    if pending:
+        workers = min(settings.RECOMMEND_BATCH_WORKERS, len(pending))
+        with timed("llm"), ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(settle, pending))
+    return [unique[key] for key in keys]
+
+
+class NameParser:
+    """
+    Cuts streamed model text into faculty names at commas and newlines,
+    keeping only names from ``allowed`` and each name once.
+    """
+
+    def __init__(self, allowed):
+        self.allowed = {name.lower(): name for name in allowed}
+        self.buffer = ""
+        self.seen = set()
+
+    def feed(self, text):
+        *complete, self.buffer = re.split(r"[,\n]", self.buffer + text)
+        return self.match(complete)
+
+    def close(self):
+        rest, self.buffer = self.buffer, ""
+        return self.match([rest])
+
+    def match(self, names):
+        matches = []
+        for name in names:
+            # Strip trailing punctuation the way normalize() does, unless
+            # the label itself ends with it.
+            key = name.strip().lower()
+            if key not in self.allowed:
+                key = key.strip(" .;")
+            if key in self.allowed and key not in self.seen:
+                self.seen.add(key)
+                matches.append(self.allowed[key])
+        return matches
+
+
+async def astream_model(recommendation):
+    """
+    Yield validated faculty names while the model is still writing its
+    answer. Raises ``ModelBusy`` and ``TimeoutError`` like
+    ``ask_model_async``.
+    """
+    client = get_async_client()
+    parser = NameParser(recommendation.allowed)
+    with model_slot():
+        async with asyncio.timeout(settings.RECOMMEND_TIMEOUT):
+            stream = await client.responses.create(
+                model=settings.RECOMMEND_MODEL, input=recommendation.prompt, stream=True,
+            )
+            # Closing the stream drops the HTTP response when the caller
+            # stops early instead of reading the rest of the answer.
+            async with stream:
+                async for event in stream:
+                    if event.type == "response.output_text.delta":
+                        for name in parser.feed(event.delta):
+                            yield name
+    for name in parser.close():
+        yield name
+
+
+async def astream_recommendation(interested_in, good_at):
+    """
+    Yield ``(event, data)`` pairs: one ``match`` per faculty as soon as it
+    is known, then ``done`` with the full list, or ``error``.
+    """
+    recommendation = await sync_to_async(prepare)(interested_in, good_at)
+    k = settings.RECOMMEND_RESULTS
+    found = []
+    if recommendation.result is None:
+        try:
+            async with aclosing(astream_model(recommendation)) as names:
+                async for name in names:
+                    found.append(name)
+                    yield "match", {"rank": len(found), "faculty": name}
+                    if len(found) == k:
+                        break
+            # Fewer than k names may be a cut-off answer; serve it but let
+            # the next request ask again rather than caching it.
+            result = recommendation.resolve(found, cache=len(found) == k)
+        except (OpenAIError, ModelBusy, TimeoutError) as exc:
+            result = recommendation.fallback()
+            if result is None:
+                logger.warning("Streaming recommendation failed: %r", exc)
+                yield "error", {"detail": "The recommendation model is unavailable.", "partial": found}
+                return
+            found = [name for name in found if name in result]
+    else:
+        result = recommendation.result
+    # Local results, cached answers and re-ranking fill-ins that were not
+    # streamed yet.
+    for name in result:
+        if name not in found:
+            found.append(name)
+            yield "match", {"rank": len(found), "faculty": name}
+    yield "done", {"results": result}
@@ -1,10 +1,88 @@
+import json
+import os
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.core.files.uploadedfile import UploadedFile
 from rest_framework import serializers
-from .models import Application
+from edux.metrics import TimedSerializerMixin
+from .filters import ApplicationFilterSerializer
+from .models import Application, RecommendationJob, UploadSession
+from .statistics import apply_deltas, statistic_key
+from .uploads import blob_for_file, received_chunks
 from universities.models import University
 
 
-class ApplicationSerializer(serializers.ModelSerializer):
-    university_name = serializers.CharField(source='university__name', read_only=True)
+class ChoiceLookup:
+    """
+    Maps free-form input ("master's degree", "phd") onto a choice value.
+
+    Exact values and labels resolve through a dict built once at import;
+    anything else falls back to a substring scan where, as before, the
+    last matching choice wins.
+    """
+
+    def __init__(self, choices):
+        self.exact = {}
+        for value, label in choices:
+            self.exact[value.lower()] = value
+            self.exact[str(label).lower()] = value
+        self.substrings = [(value.lower(), value) for value, _ in reversed(choices)]
+
+    def __call__(self, text):
+        key = text.strip().lower()
+        if key in self.exact:
+            return self.exact[key]
+        for substring, value in self.substrings:
+            if substring in key:
+                return value
+        return text
+
+
+CHOICE_LOOKUPS = {
+    "prior_highest_education": ChoiceLookup(Application.PriorEducation.choices),
+    "target_program": ChoiceLookup(Application.TargetProgram.choices),
+}
+
+
+def normalize_choices(data):
+    for field, lookup in CHOICE_LOOKUPS.items():
+        if isinstance(data.get(field), str):
+            data[field] = lookup(data[field])
+    return data
+
+
+def resolve_documents(attrs):
+    # Documents are stored once per distinct content: a finished chunked
+    # upload or a plain multipart file both resolve to a shared blob,
+    # and the application only references its path.
+    for field in ("education_document", "recommendation_letter"):
+        upload = attrs.pop(f"{field}_upload", None)
+        if upload is not None:
+            attrs[field] = upload.blob.file.name
+        elif isinstance(attrs.get(field), UploadedFile):
+            attrs[field] = blob_for_file(attrs[field]).file.name
+    return attrs
+
+
+class CompletedUploadField(serializers.PrimaryKeyRelatedField):
+    """
+    A finished upload session of the requesting user, by id.
+    """
+
+    def get_queryset(self):
+        return UploadSession.objects.filter(
+            user=self.context["request"].user,
+            status=UploadSession.Status.COMPLETE,
+        ).select_related("blob")
+
+
+class ApplicationSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    university_name = serializers.CharField(source='university.name', read_only=True)
+    education_document_upload = CompletedUploadField(write_only=True, required=False)
+    recommendation_letter_upload = CompletedUploadField(write_only=True, required=False)
+
     class Meta:
         model = Application
         fields = [
@@ -18,28 +96,220 @@ class ApplicationSerializer(serializers.ModelSerializer):
             "status",
             "created_at",
             "target_program",
+            "education_document_upload",
+            "recommendation_letter_upload",
         ]
         read_only_fields = ["user", "status", "university_name"]  # user set automatically
 
     def create(self, validated_data):
         validated_data["user"] = self.context["request"].user
         validated_data.pop('university_name', None)
-        return super().create(validated_data=validated_data)
+        # The post_save statistics update commits with the row.
+        with transaction.atomic():
+            return super().create(validated_data=validated_data)
+
+    def update(self, instance, validated_data):
+        with transaction.atomic():
+            return super().update(instance, validated_data)
+
+    def validate(self, attrs):
+        return resolve_documents(attrs)
+
+    def to_internal_value(self, data):
+        # A multipart body without files arrives as an immutable QueryDict.
+        data = data.dict() if hasattr(data, "dict") else dict(data)
+        return super().to_internal_value(normalize_choices(data))
+
+
+class ApplicationTargetSerializer(serializers.Serializer):
+    university = serializers.IntegerField()
+    target_program = serializers.ChoiceField(choices=Application.TargetProgram.choices)
 
     def to_internal_value(self, data):
-        print(data)
-        data['university_name'] = 'qwe'
-        prior_highest_education_list = [x.value for x in Application.PriorEducation]
-        for pr in prior_highest_education_list:
-            if pr.lower() in data['prior_highest_education'].lower():
-                data['prior_highest_education'] = pr
-        target_program_list = [x.value for x in Application.TargetProgram]
-        for tp in target_program_list:
-            if tp.lower() in data['target_program'].lower():
-                data['target_program'] = tp
+        if isinstance(data, dict):
+            data = normalize_choices(dict(data))
         return super().to_internal_value(data)
 
 
+class ApplicationBatchSerializer(serializers.Serializer):
+    """
+    One set of documents and education details applied to many
+    (university, target_program) targets. ``targets`` may be sent as a JSON
+    string so the whole batch fits in a single multipart request.
+    """
+    MAX_TARGETS = 50
+
+    targets = serializers.JSONField()
+    prior_highest_education = serializers.ChoiceField(choices=Application.PriorEducation.choices,
+                                                      default=Application.PriorEducation.NO_EDUCATION)
+    essay = serializers.CharField(allow_blank=True, required=False, default="")
+    education_document = serializers.FileField(required=False)
+    recommendation_letter = serializers.FileField(required=False)
+    education_document_upload = CompletedUploadField(required=False)
+    recommendation_letter_upload = CompletedUploadField(required=False)
+
+    def to_internal_value(self, data):
+        data = data.dict() if hasattr(data, "dict") else dict(data)
+        return super().to_internal_value(normalize_choices(data))
+
+    def validate_targets(self, value):
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                raise serializers.ValidationError("Value must be valid JSON.")
+        targets = ApplicationTargetSerializer(data=value, many=True)
+        targets.is_valid(raise_exception=True)
+        targets = targets.validated_data
+        if not targets:
+            raise serializers.ValidationError("At least one target is required.")
+        if len(targets) > self.MAX_TARGETS:
+            raise serializers.ValidationError(f"At most {self.MAX_TARGETS} targets per batch.")
+        pairs = [(target["university"], target["target_program"]) for target in targets]
+        if len(set(pairs)) != len(pairs):
+            raise serializers.ValidationError("Duplicate (university, target_program) pair.")
+        # One query for every university in the batch; kept for the response.
+        self.universities = University.objects.in_bulk({pk for pk, _ in pairs})
+        missing = sorted({pk for pk, _ in pairs} - set(self.universities))
+        if missing:
+            raise serializers.ValidationError(f"Unknown universities {missing}.")
+        return targets
+
+    def validate(self, attrs):
+        return resolve_documents(attrs)
+
+    def create(self, validated_data):
+        targets = validated_data.pop("targets")
+        applications = [
+            Application(
+                user=self.context["request"].user,
+                university=self.universities[target["university"]],
+                target_program=target["target_program"],
+                **validated_data,
+            )
+            for target in targets
+        ]
+        with transaction.atomic():
+            applications = Application.objects.bulk_create(applications)
+            # bulk_create() skips the model signals, so count the rows here.
+            apply_deltas(Counter(statistic_key(application) for application in applications))
+        return applications
+
+
+class BulkStatusSerializer(serializers.Serializer):
+    """
+    Target status plus either an explicit ``ids`` list or a ``filter``.
+    """
+    status = serializers.ChoiceField(choices=Application.ApplicationStatus.choices)
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False,
+                                allow_empty=False, max_length=10000)
+    filter = ApplicationFilterSerializer(required=False)
+
+    def validate(self, attrs):
+        if ("ids" in attrs) == ("filter" in attrs):
+            raise serializers.ValidationError("Provide exactly one of 'ids' or 'filter'.")
+        if "filter" in attrs and not attrs["filter"]:
+            # An empty filter would move every application.
+            raise serializers.ValidationError({"filter": "Give at least one criterion."})
+        return attrs
+
+
+class ApplicationStatisticsQuerySerializer(serializers.Serializer):
+    GROUP_FIELDS = ["university", "status", "target_program", "prior_highest_education"]
+
+    university = serializers.IntegerField(required=False)
+    status = serializers.ChoiceField(choices=Application.ApplicationStatus.choices, required=False)
+    target_program = serializers.ChoiceField(choices=Application.TargetProgram.choices, required=False)
+    prior_highest_education = serializers.ChoiceField(choices=Application.PriorEducation.choices, required=False)
+    group_by = serializers.CharField(required=False, default="university,status")
+
+    def validate_group_by(self, value):
+        fields = [field.strip() for field in value.split(",") if field.strip()]
+        unknown = set(fields) - set(self.GROUP_FIELDS)
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown fields {sorted(unknown)}; choose from {self.GROUP_FIELDS}."
+            )
+        return fields
+
+
 class RecommendSerializer(serializers.Serializer):
     interested_in = serializers.CharField(allow_blank=True)
     good_at = serializers.CharField(allow_blank=True)
+
+
+class RecommendationJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RecommendationJob
+        fields = [
+            "id",
+            "interested_in",
+            "good_at",
+            "status",
+            "result",
+            "error",
+            "attempts",
+            "created_at",
+            "finished_at",
+        ]
+        read_only_fields = ["status", "result", "error", "attempts", "created_at", "finished_at"]
+        extra_kwargs = {
+            "interested_in": {"allow_blank": True, "required": True},
+            "good_at": {"allow_blank": True, "required": True},
+        }
+
+    def create(self, validated_data):
+        validated_data["user"] = self.context["request"].user
+        return super().create(validated_data)
+
+
+class UploadSessionSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    size = serializers.IntegerField(min_value=1, max_value=settings.UPLOAD_MAX_SIZE)
+    sha256 = serializers.RegexField(r"^[0-9a-fA-F]{64}$")
+    chunk_size = serializers.IntegerField(required=False,
+                                          min_value=64 * 1024,
+                                          max_value=settings.UPLOAD_CHUNK_MAX_SIZE)
+    total_chunks = serializers.IntegerField(read_only=True)
+    received_chunks = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = [
+            "id",
+            "filename",
+            "size",
+            "sha256",
+            "chunk_size",
+            "total_chunks",
+            "received_chunks",
+            "status",
+        ]
+        read_only_fields = ["status"]
+
+    def get_received_chunks(self, session):
+        if session.status == UploadSession.Status.COMPLETE:
+            return list(range(session.total_chunks))
+        return received_chunks(session)
+
+    def validate_filename(self, value):
+        return os.path.basename(value)
+
+    def validate_sha256(self, value):
+        return value.lower()
+
+    def create(self, validated_data):
+        validated_data["user"] = self.context["request"].user
+        validated_data.setdefault("chunk_size", settings.UPLOAD_CHUNK_SIZE)
+        # The same user already sent this exact content: nothing to transfer.
+        # Never shortcut on another user's blob, since a bare digest is no
+        # proof the client actually holds the document.
+        previous = UploadSession.objects.filter(
+            user=validated_data["user"],
+            sha256=validated_data["sha256"],
+            status=UploadSession.Status.COMPLETE,
+            blob__isnull=False,
+        ).select_related("blob").first()
+        if previous is not None:
+            validated_data["blob"] = previous.blob
+            validated_data["status"] = UploadSession.Status.COMPLETE
+        return super().create(validated_data)
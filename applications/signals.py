@@ -0,0 +1,40 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from .models import Application
+from .statistics import KEY_FIELDS, apply_deltas, statistic_key
+
+STATISTIC_FIELD_NAMES = {*KEY_FIELDS, "university"}
+
+
+def load_statistic_key(sender, instance, raw=False, **kwargs):
+    # Instances not loaded through Application.from_db (or loaded with
+    # deferred fields) do not know their stored key yet.
+    if raw or instance.pk is None or hasattr(instance, "_statistic_key"):
+        return
+    row = Application.objects.filter(pk=instance.pk).values_list(*KEY_FIELDS).first()
+    if row is not None:
+        instance._statistic_key = row
+
+
+def update_statistics(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not STATISTIC_FIELD_NAMES & set(update_fields):
+        return
+    new_key = statistic_key(instance)
+    old_key = None if created else getattr(instance, "_statistic_key", None)
+    if old_key != new_key:
+        deltas = {new_key: 1}
+        if old_key is not None:
+            deltas[old_key] = -1
+        apply_deltas(deltas)
+    instance._statistic_key = new_key
+
+
+def remove_statistics(sender, instance, **kwargs):
+    apply_deltas({getattr(instance, "_statistic_key", statistic_key(instance)): -1})
+
+
+pre_save.connect(load_statistic_key, sender=Application)
+post_save.connect(update_statistics, sender=Application)
+post_delete.connect(remove_statistics, sender=Application)
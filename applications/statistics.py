@@ -0,0 +1,67 @@
+"""
+Incremental maintenance of the ``ApplicationStatistic`` summary table.
+
+Every write path that changes an application's university, status,
+target program or prior education turns the change into per-key count
+deltas and applies them in the same transaction as the write (the
+serializers wrap their saves in ``transaction.atomic()`` for this), so
+the summary never needs a scan of ``Application`` to answer a query.
+"""
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F
+
+from .models import Application, ApplicationStatistic
+
+KEY_FIELDS = Application.STATISTIC_FIELDS
+
+
+def statistic_key(application):
+    return tuple(getattr(application, field) for field in KEY_FIELDS)
+
+
+def apply_deltas(deltas):
+    """
+    Add ``deltas`` ({key: change}) to the summary table.
+
+    Keys are applied in sorted order so concurrent writers lock summary
+    rows in the same order and cannot deadlock each other.
+    """
+    for key in sorted(deltas):
+        delta = deltas[key]
+        if not delta:
+            continue
+        lookup = dict(zip(KEY_FIELDS, key))
+        if ApplicationStatistic.objects.filter(**lookup).update(count=F("count") + delta) or delta < 0:
+            # A decrement with no row to apply to comes from a cascade that
+            # already removed the university's summary rows.
+            continue
+        try:
+            with transaction.atomic():
+                ApplicationStatistic.objects.create(count=delta, **lookup)
+        except IntegrityError:
+            # A concurrent writer created the row first.
+            ApplicationStatistic.objects.filter(**lookup).update(count=F("count") + delta)
+
+
+def rebuild():
+    """
+    Recompute the whole summary table from ``Application``.
+
+    Writers are blocked for the duration on PostgreSQL so no change can
+    slip in between the scan and the swap.
+    """
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(f"LOCK TABLE {Application._meta.db_table} IN SHARE MODE")
+        ApplicationStatistic.objects.all().delete()
+        rows = (
+            Application.objects.order_by()
+            .values(*KEY_FIELDS)
+            .annotate(count=Count("pk"))
+        )
+        ApplicationStatistic.objects.bulk_create(
+            [ApplicationStatistic(**row) for row in rows.iterator()],
+            batch_size=1000,
+        )
+        return ApplicationStatistic.objects.count()
@@ -1,3 +1,116 @@
-from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from accounts.models import CustomUser
+from universities.models import University
+from .models import Application, ApplicationStatistic
+from .statistics import KEY_FIELDS, rebuild
+
+Status = Application.ApplicationStatus
+
+
+def summary():
+    return {
+        tuple(row[:-1]): row[-1]
+        for row in ApplicationStatistic.objects.filter(count__gt=0).values_list(*KEY_FIELDS, "count")
+    }
+
+
+class ApplicationStatisticsTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user("applicant@example.com", "pw")
+        cls.staff = CustomUser.objects.create_user("staff@example.com", "pw", is_staff=True)
+        cls.first = University.objects.create(name="First")
+        cls.second = University.objects.create(name="Second")
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def key(self, university, status=Status.SUBMITTED, program="BACHELOR", education="NO EDUCATION"):
+        return (university.pk, status, program, education)
+
+    def assertMatchesRebuild(self):
+        incremental = summary()
+        rebuild()
+        self.assertEqual(summary(), incremental)
+
+    def create(self, university, **data):
+        response = self.client.post(reverse("application-list"), {"university": university.pk, **data})
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.data["id"]
+
+    def test_create_counts_the_application(self):
+        self.create(self.first)
+        self.create(self.first)
+        self.create(self.second, target_program="MASTER")
+        self.assertEqual(summary(), {
+            self.key(self.first): 2,
+            self.key(self.second, program="MASTER"): 1,
+        })
+        self.assertMatchesRebuild()
+
+    def test_update_moves_the_count(self):
+        pk = self.create(self.first)
+        response = self.client.patch(reverse("application-detail", args=[pk]), {"target_program": "PHD"})
+        self.assertEqual(response.status_code, 200, response.content)
+        application = Application.objects.get(pk=pk)
+        application.status = Status.UNDER_REVIEW
+        application.save()
+        self.assertEqual(summary(), {self.key(self.first, Status.UNDER_REVIEW, "PHD"): 1})
+        self.assertMatchesRebuild()
+
+    def test_delete_removes_the_count(self):
+        pk = self.create(self.first)
+        self.create(self.first)
+        response = self.client.delete(reverse("application-detail", args=[pk]))
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(summary(), {self.key(self.first): 1})
+        self.assertMatchesRebuild()
+
+    def test_bulk_status_moves_the_counts(self):
+        ids = [self.create(self.first), self.create(self.first), self.create(self.second)]
+        self.client.force_authenticate(self.staff)
+        response = self.client.post(reverse("application-bulk-status"),
+                                    {"status": Status.UNDER_REVIEW, "ids": ids[:2]}, format="json")
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.data["updated"], 2)
+        self.assertEqual(summary(), {
+            self.key(self.first, Status.UNDER_REVIEW): 2,
+            self.key(self.second): 1,
+        })
+        self.assertMatchesRebuild()
+
+    def test_bulk_status_rejects_an_empty_filter(self):
+        self.create(self.first)
+        self.client.force_authenticate(self.staff)
+        response = self.client.post(reverse("application-bulk-status"),
+                                    {"status": Status.UNDER_REVIEW, "filter": {}}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(summary(), {self.key(self.first): 1})
+
+    def test_batch_create_counts_every_application(self):
+        response = self.client.post(reverse("application-batch"), {
+            "targets": [
+                {"university": self.first.pk, "target_program": "BACHELOR"},
+                {"university": self.first.pk, "target_program": "MASTER"},
+                {"university": self.second.pk, "target_program": "BACHELOR"},
+            ],
+            "prior_highest_education": "HIGH SCHOOL",
+        }, format="json")
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(summary(), {
+            self.key(self.first, education="HIGH SCHOOL"): 1,
+            self.key(self.first, program="MASTER", education="HIGH SCHOOL"): 1,
+            self.key(self.second, education="HIGH SCHOOL"): 1,
+        })
+        self.assertMatchesRebuild()
+
+    def test_deleting_a_university_drops_its_counts(self):
+        self.create(self.first)
+        self.create(self.first, target_program="MASTER")
+        self.create(self.second)
+        self.first.delete()
+        self.assertFalse(ApplicationStatistic.objects.filter(university_id=self.first.pk).exists())
+        self.assertEqual(summary(), {self.key(self.second): 1})
+        self.assertMatchesRebuild()
@@ -0,0 +1,144 @@
+"""
+Resumable chunked uploads and content-addressed document storage.
+
+Chunks land in ``UPLOAD_CHUNK_ROOT/<session id>/<index>.part`` and may
+arrive in any order or be re-sent. Completing a session concatenates them,
+checks the SHA-256 the client declared up front, and files the result as a
+:class:`DocumentBlob` - or reuses the existing blob with that digest.
+"""
+import hashlib
+import os
+import posixpath
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.db import IntegrityError, transaction
+
+from .models import DocumentBlob, UploadSession
+
+READ_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    pass
+
+
+def chunk_dir(session):
+    return Path(settings.UPLOAD_CHUNK_ROOT) / str(session.pk)
+
+
+def received_chunks(session):
+    directory = chunk_dir(session)
+    if not directory.is_dir():
+        return []
+    return sorted(int(path.stem) for path in directory.glob("*.part"))
+
+
+def expected_chunk_size(session, index):
+    if index == session.total_chunks - 1:
+        return session.size - index * session.chunk_size
+    return session.chunk_size
+
+
+def write_chunk(session, index, stream, sha256):
+    """
+    Store chunk ``index`` read from ``stream``; it must match its expected
+    length and the hex SHA-256 the client sent alongside it.
+    """
+    if not 0 <= index < session.total_chunks:
+        raise UploadError(f"Chunk index must be between 0 and {session.total_chunks - 1}.")
+    expected = expected_chunk_size(session, index)
+    directory = chunk_dir(session)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    digest = hashlib.sha256()
+    written = 0
+    with tempfile.NamedTemporaryFile(dir=directory, suffix=".tmp", delete=False) as temp:
+        try:
+            while written <= expected:
+                data = stream.read(min(READ_SIZE, expected + 1 - written))
+                if not data:
+                    break
+                temp.write(data)
+                digest.update(data)
+                written += len(data)
+            if written != expected:
+                raise UploadError(f"Chunk {index} must be {expected} bytes, got {written}.")
+            if digest.hexdigest() != sha256.lower():
+                raise UploadError(f"Chunk {index} failed its SHA-256 check.")
+        except Exception:
+            os.unlink(temp.name)
+            raise
+    # Atomic rename: a chunk is either fully present or absent.
+    os.replace(temp.name, directory / f"{index}.part")
+
+
+def blob_name(sha256, filename):
+    extension = posixpath.splitext(filename)[1].lower()[:16]
+    return f"{sha256[:2]}/{sha256}{extension}"
+
+
+def store_blob(file, sha256, size, filename):
+    """
+    Return the blob for ``sha256``, saving ``file`` only if no blob with
+    that digest exists yet.
+    """
+    blob = DocumentBlob.objects.filter(sha256=sha256).first()
+    if blob is not None:
+        return blob
+    blob = DocumentBlob(sha256=sha256, size=size)
+    blob.file.save(blob_name(sha256, filename), File(file), save=False)
+    try:
+        with transaction.atomic():
+            blob.save()
+    except IntegrityError:
+        # Another upload of the same content won the race.
+        blob.file.delete(save=False)
+        blob = DocumentBlob.objects.get(sha256=sha256)
+    return blob
+
+
+def blob_for_file(file, filename=None):
+    """
+    Hash an uploaded file and return the matching blob, storing it if new.
+    """
+    digest = hashlib.sha256()
+    for data in file.chunks(READ_SIZE):
+        digest.update(data)
+    file.seek(0)
+    return store_blob(file, digest.hexdigest(), file.size, filename or file.name)
+
+
+def complete_session(session):
+    """
+    Assemble every chunk of ``session`` into a verified blob.
+    """
+    missing = sorted(set(range(session.total_chunks)) - set(received_chunks(session)))
+    if missing:
+        raise UploadError(f"Missing chunks: {missing[:20]}")
+
+    directory = chunk_dir(session)
+    digest = hashlib.sha256()
+    with tempfile.TemporaryFile(dir=directory) as assembled:
+        for index in range(session.total_chunks):
+            with open(directory / f"{index}.part", "rb") as part:
+                while data := part.read(READ_SIZE):
+                    digest.update(data)
+                    assembled.write(data)
+        if digest.hexdigest() != session.sha256:
+            raise UploadError("Assembled file failed its SHA-256 check.")
+        assembled.seek(0)
+        blob = store_blob(assembled, session.sha256, session.size, session.filename)
+
+    session.blob = blob
+    session.status = UploadSession.Status.COMPLETE
+    session.save(update_fields=["blob", "status"])
+    discard_chunks(session)
+    return session
+
+
+def discard_chunks(session):
+    shutil.rmtree(chunk_dir(session), ignore_errors=True)
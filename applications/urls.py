@@ -1,8 +1,38 @@
 from django.urls import path
-from .views import ApplicationListCreateView, ApplicationDetailView, recommend_view
+from .views import (
+    ApplicationListCreateView,
+    ApplicationBatchCreateView,
+    ApplicationDetailView,
+    ApplicationBulkStatusView,
+    ApplicationStatisticsView,
+    ApplicationExportView,
+    UploadSessionCreateView,
+    UploadSessionDetailView,
+    UploadChunkView,
+    UploadCompleteView,
+    recommend_view,
+    recommend_async_view,
+    recommend_stream_view,
+    RecommendBatchView,
+    RecommendationJobCreateView,
+    RecommendationJobDetailView,
+)
 
 urlpatterns = [
     path("applications/", ApplicationListCreateView.as_view(), name="application-list"),
+    path("applications/batch/", ApplicationBatchCreateView.as_view(), name="application-batch"),
     path("applications/<int:pk>/", ApplicationDetailView.as_view(), name="application-detail"),
+    path("applications/bulk-status/", ApplicationBulkStatusView.as_view(), name="application-bulk-status"),
+    path("applications/statistics/", ApplicationStatisticsView.as_view(), name="application-statistics"),
+    path("applications/export/", ApplicationExportView.as_view(), name="application-export"),
+    path("uploads/", UploadSessionCreateView.as_view(), name="upload-create"),
+    path("uploads/<uuid:pk>/", UploadSessionDetailView.as_view(), name="upload-detail"),
+    path("uploads/<uuid:pk>/chunks/<int:index>/", UploadChunkView.as_view(), name="upload-chunk"),
+    path("uploads/<uuid:pk>/complete/", UploadCompleteView.as_view(), name="upload-complete"),
     path('recommend/', recommend_view, name='recommend_view'),
+    path('recommend/batch/', RecommendBatchView.as_view(), name='recommend-batch'),
+    path('recommend/jobs/', RecommendationJobCreateView.as_view(), name='recommendation-job-create'),
+    path('recommend/jobs/<uuid:pk>/', RecommendationJobDetailView.as_view(), name='recommendation-job-detail'),
+    path('recommend/async/', recommend_async_view, name='recommend_async_view'),
+    path('recommend/stream/', recommend_stream_view, name='recommend_stream_view'),
 ]
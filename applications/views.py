@@ -1,77 +1,411 @@
-from rest_framework import generics, permissions, parsers
+import io
+import json
+import logging
+from collections import Counter
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import JsonResponse, StreamingHttpResponse
+from django.db.models import Sum
+from django.shortcuts import get_object_or_404
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework import generics, permissions, parsers, status
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import APIException, ValidationError
 from rest_framework.permissions import IsAuthenticated, AllowAny
 
 from rest_framework.response import Response
-from openai import OpenAI
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+from openai import OpenAIError
 
-from .models import Application
-from universities.models import University
-from .serializers import ApplicationSerializer, RecommendSerializer
+from .models import Application, ApplicationStatistic, RecommendationJob, UploadSession
+from .pagination import ApplicationCursorPagination
+from .export import CONTENT_TYPES, iter_export
+from .filters import ApplicationFilterSerializer, filter_applications
+from .serializers import (
+    ApplicationBatchSerializer,
+    ApplicationSerializer,
+    ApplicationStatisticsQuerySerializer,
+    BulkStatusSerializer,
+    RecommendationJobSerializer,
+    RecommendSerializer,
+    UploadSessionSerializer,
+)
 from .permissions import IsOwnerOrStaff
+from .statistics import KEY_FIELDS, apply_deltas
+from .uploads import UploadError, complete_session, write_chunk
+from .recommend import ModelBusy, arecommend, astream_recommendation, recommend, recommend_many
+
+logger = logging.getLogger(__name__)
 
 
 class ApplicationListCreateView(generics.ListCreateAPIView):
-    queryset = Application.objects.all()
     serializer_class = ApplicationSerializer
-    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    permission_classes = [permissions.IsAuthenticated]
     parser_classes = [parsers.MultiPartParser, parsers.FormParser]
+    pagination_class = ApplicationCursorPagination
+
+    def get_queryset(self):
+        return Application.objects.filter(user=self.request.user).select_related("university")
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
-    def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
 
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+class ApplicationBatchCreateView(APIView):
+    """
+    Apply to several universities at once with one set of documents.
 
-        serializer = self.get_serializer(queryset, many=True)
-        print(serializer.data)
-        return Response(serializer.data)
+    The documents are stored a single time and every application is
+    created by one ``bulk_create`` inside a single transaction, so the
+    batch either succeeds completely or not at all.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [parsers.MultiPartParser, parsers.FormParser, parsers.JSONParser]
+
+    def post(self, request):
+        serializer = ApplicationBatchSerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+        applications = serializer.save()
+        data = ApplicationSerializer(applications, many=True, context={"request": request}).data
+        return Response(data, status=status.HTTP_201_CREATED)
 
-    def filter_queryset(self, queryset):
-        user = self.request.user
-        return queryset.filter(user=user)
 
 class ApplicationDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Application.objects.all()
     serializer_class = ApplicationSerializer
-    permission_classes = [IsOwnerOrStaff]
+    permission_classes = [permissions.IsAuthenticated, IsOwnerOrStaff]
     parser_classes = [parsers.MultiPartParser, parsers.FormParser]
 
-    def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
-        serializer = self.get_serializer(instance)
-        print(serializer.data)
-        return Response(serializer.data)
+    def get_queryset(self):
+        queryset = Application.objects.select_related("university")
+        if self.request.user.is_staff:
+            return queryset
+        return queryset.filter(user=self.request.user)
+
+
+class ApplicationBulkStatusView(APIView):
+    """
+    Move many applications to one status with a single UPDATE.
+
+    Rows are locked and read once to validate each transition against
+    ``Application.STATUS_TRANSITIONS``; every requested id gets a result of
+    ``updated``, ``unchanged``, ``invalid_transition`` or ``not_found``.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request):
+        serializer = BulkStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        target = data["status"]
+        sources = {
+            source for source, targets in Application.STATUS_TRANSITIONS.items()
+            if target in targets
+        }
+
+        with transaction.atomic():
+            queryset = Application.objects.select_for_update()
+            if "ids" in data:
+                queryset = queryset.filter(pk__in=data["ids"])
+            else:
+                queryset = filter_applications(queryset, data["filter"])
+            rows = {row[0]: row[1:] for row in queryset.values_list("pk", *KEY_FIELDS)}
+            current = {pk: key[1] for pk, key in rows.items()}
+            movable = [pk for pk, source in current.items() if source in sources]
+            updated = Application.objects.filter(pk__in=movable).update(status=target)
+            # QuerySet.update() skips the model signals, so move the counts here.
+            deltas = Counter()
+            for pk in movable:
+                key = rows[pk]
+                deltas[key] -= 1
+                deltas[(key[0], target, *key[2:])] += 1
+            apply_deltas(deltas)
+
+        results = []
+        for pk in data.get("ids", current):
+            source = current.get(pk)
+            if source is None:
+                result = "not_found"
+            elif source == target:
+                result = "unchanged"
+            elif source in sources:
+                result = "updated"
+            else:
+                result = "invalid_transition"
+            results.append({"id": pk, "from": source, "result": result})
+        return Response({"status": target, "updated": updated, "results": results})
+
+
+class ApplicationStatisticsView(APIView):
+    """
+    Application counts grouped by any of university, status, target program
+    and prior education, read from the incrementally maintained summary
+    table rather than by scanning applications.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        serializer = ApplicationStatisticsQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = dict(serializer.validated_data)
+        group_by = params.pop("group_by")
+
+        queryset = ApplicationStatistic.objects.filter(count__gt=0, **params)
+        columns = group_by + (["university__name"] if "university" in group_by else [])
+        rows = queryset.values(*columns).annotate(total=Sum("count")).order_by(*group_by)
+
+        results = []
+        for row in rows:
+            if "university__name" in row:
+                row["university_name"] = row.pop("university__name")
+            row["count"] = row.pop("total")
+            results.append(row)
+        return Response({"total": sum(row["count"] for row in results), "results": results})
+
+
+class ApplicationExportView(APIView):
+    """
+    Stream matching applications as CSV (default) or JSONL
+    (``?export_format=jsonl``), filtered like the bulk status endpoint.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        serializer = ApplicationFilterSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        fmt = request.query_params.get("export_format", "csv")
+        if fmt not in CONTENT_TYPES:
+            raise ValidationError({"export_format": [f"Choose one of {sorted(CONTENT_TYPES)}."]})
+
+        response = StreamingHttpResponse(
+            iter_export(serializer.validated_data, fmt),
+            content_type=CONTENT_TYPES[fmt],
+        )
+        response["Content-Disposition"] = f'attachment; filename="applications.{fmt}"'
+        return response
+
+
+class UploadSessionCreateView(generics.CreateAPIView):
+    """
+    Start a resumable upload: declare the file's name, size and SHA-256,
+    then PUT its chunks in any order and POST to ``complete/``.
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+
+class UploadSessionDetailView(generics.RetrieveAPIView):
+    serializer_class = UploadSessionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return UploadSession.objects.filter(user=self.request.user)
+
+
+class UploadChunkView(APIView):
+    """
+    Receive one raw chunk; the body must hash to the ``X-Chunk-SHA256``
+    header. Re-sending a chunk replaces it.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def put(self, request, pk, index):
+        session = get_object_or_404(UploadSession, pk=pk, user=request.user)
+        if session.status == UploadSession.Status.COMPLETE:
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        sha256 = request.headers.get("X-Chunk-SHA256")
+        if not sha256:
+            raise ValidationError({"X-Chunk-SHA256": ["This header is required."]})
+        try:
+            write_chunk(session, index, request.stream or io.BytesIO(), sha256)
+        except UploadError as exc:
+            raise ValidationError({"detail": str(exc)})
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadCompleteView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk):
+        with transaction.atomic():
+            session = get_object_or_404(
+                UploadSession.objects.select_for_update(), pk=pk, user=request.user,
+            )
+            if session.status == UploadSession.Status.PENDING:
+                try:
+                    complete_session(session)
+                except UploadError as exc:
+                    raise ValidationError({"detail": str(exc)})
+        return Response(UploadSessionSerializer(session, context={"request": request}).data)
 
 
 @api_view(['POST'])
 def recommend_view(request, *args, **kwargs):
-    client = OpenAI()
     serializer = RecommendSerializer(data=request.data)
-    if serializer.is_valid(raise_exception=True):
-        data = serializer.validated_data
-        data['interested_in'] = data['interested_in'].lower().replace('i\'m interested in', '')
-        data['good_at'] = data['good_at'].lower().replace('i think i\'m good at', '')
-    universities = University.objects.prefetch_related('faculty_set').all()
-    faculty_names_list = []
-    for university in universities:
-        faculties = university.faculty_set.all()
-        l = [f'{faculty.name} of {university.name}' for faculty in faculties]
-        faculty_names_list.extend(l)
-    input_text = (f'Here is the list of faculties of universities:\n{",".join(faculty_names_list)}.\n'
-                  f'If a person would say that he is good at:\n{data["good_at"]}\n'
-                  f'And also if a person would be interested in:\n{data["interested_in"]}'
-                  f'Choose exactly 5 of the faculties that would fit that person'
-                  f' and return only them separated by comma')
-    print('INPUT TEXT', input_text)
-    response = client.responses.create(
-    model="gpt-5",
-    input=input_text
-)
-    print('OUTPUT TEXT', response.output_text)
-    return Response(response.output_text.split(','))
+    serializer.is_valid(raise_exception=True)
+    return Response(recommend(**serializer.validated_data))
+
+
+class RecommendBatchView(APIView):
+    """
+    Recommendations for many applicants at once, e.g. a whole class.
+
+    Takes ``{"items": [{"interested_in": ..., "good_at": ...}, ...]}`` and
+    answers ``{"results": [...]}`` in the same order. Each item is
+    validated on its own, so one bad entry only fails itself.
+    """
+    MAX_ITEMS = 200
+
+    def post(self, request):
+        items = request.data.get("items") if isinstance(request.data, dict) else None
+        if not isinstance(items, list) or not items:
+            raise ValidationError({"items": ["A non-empty list is required."]})
+        if len(items) > self.MAX_ITEMS:
+            raise ValidationError({"items": [f"At most {self.MAX_ITEMS} items per batch."]})
+
+        results = [None] * len(items)
+        valid = []
+        for index, item in enumerate(items):
+            serializer = RecommendSerializer(data=item)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                results[index] = {"errors": serializer.errors}
+
+        recommendations = recommend_many(
+            (data["interested_in"], data["good_at"]) for _, data in valid
+        )
+        for (index, _), recommendation in zip(valid, recommendations):
+            if recommendation.error is not None:
+                results[index] = {"errors": {"detail": ["The recommendation model is unavailable."]}}
+            else:
+                results[index] = {"result": recommendation.result}
+        return Response({"results": results})
+
+
+class RecommendationJobCreateView(generics.CreateAPIView):
+    """
+    Queue a recommendation instead of waiting for it: answers 202 with the
+    job, which ``run_recommendation_workers`` picks up and the client polls
+    at ``recommend/jobs/<id>/``.
+    """
+    serializer_class = RecommendationJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return response
+
+
+class RecommendationJobDetailView(generics.RetrieveAPIView):
+    serializer_class = RecommendationJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return RecommendationJob.objects.filter(user=self.request.user)
+
+
+def authenticate(request):
+    """
+    Run the configured DRF authenticators against a plain Django request.
+    """
+    for authenticator in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        result = authenticator().authenticate(request)
+        if result is not None:
+            return result[0]
+    return None
+
+
+async def read_recommend_request(request):
+    """
+    Authenticate and validate a JSON recommendation request in an async
+    view. Returns ``(validated_data, None)`` or ``(None, error_response)``.
+    """
+    try:
+        user = await sync_to_async(authenticate)(request)
+    except APIException as exc:
+        return None, JsonResponse({"detail": str(exc.detail)}, status=exc.status_code)
+    if user is None:
+        return None, JsonResponse({"detail": "Authentication credentials were not provided."},
+                                  status=status.HTTP_401_UNAUTHORIZED,
+                                  headers={"WWW-Authenticate": "Bearer"})
+
+    try:
+        payload = json.loads(request.body or b"{}")
+    except ValueError:
+        return None, JsonResponse({"detail": "JSON parse error."}, status=status.HTTP_400_BAD_REQUEST)
+    serializer = RecommendSerializer(data=payload)
+    if not serializer.is_valid():
+        return None, JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    return serializer.validated_data, None
+
+
+def requires_asgi():
+    return JsonResponse({"detail": "This endpoint needs an ASGI server; use recommend/ instead."},
+                        status=status.HTTP_501_NOT_IMPLEMENTED)
+
+
+@csrf_exempt
+@require_POST
+async def recommend_async_view(request):
+    """
+    ``recommend_view`` for ASGI deployments: the model call is awaited on a
+    shared async client instead of holding a worker thread. When every
+    model slot is busy the request fails fast with 503 and Retry-After.
+
+    Under WSGI each request would run on a throwaway event loop with its
+    own client, so the view answers 501 there.
+    """
+    if not isinstance(request, ASGIRequest):
+        return requires_asgi()
+    data, error = await read_recommend_request(request)
+    if error is not None:
+        return error
+
+    try:
+        result = await arecommend(**data)
+    except ModelBusy:
+        return JsonResponse({"detail": "Too many recommendations in progress, try again shortly."},
+                            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            headers={"Retry-After": str(settings.RECOMMEND_RETRY_AFTER)})
+    except TimeoutError:
+        return JsonResponse({"detail": "The recommendation model did not answer in time."},
+                            status=status.HTTP_504_GATEWAY_TIMEOUT)
+    except OpenAIError:
+        logger.exception("Recommendation model call failed")
+        return JsonResponse({"detail": "The recommendation model is unavailable."},
+                            status=status.HTTP_502_BAD_GATEWAY)
+    return JsonResponse(result, safe=False)
+
+
+@csrf_exempt
+@require_POST
+async def recommend_stream_view(request):
+    """
+    Server-Sent Events variant of ``recommend_view``: each faculty is sent
+    as a ``match`` event as soon as the model has written it, followed by
+    ``done`` with the whole list (or ``error``).
+
+    Requires ASGI. Under WSGI Django buffers an async response body until
+    it ends, so the events would arrive all at once; the view answers 501
+    there instead.
+    """
+    if not isinstance(request, ASGIRequest):
+        return requires_asgi()
+    data, error = await read_recommend_request(request)
+    if error is not None:
+        return error
+
+    async def events():
+        async for event, payload in astream_recommendation(**data):
+            yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -3,6 +3,11 @@ ASGI config for edux project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with uvicorn workers so async views such as
+``recommend/async/`` await the model without holding a worker:
+
+    gunicorn edux.asgi:application -k uvicorn.workers.UvicornWorker
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -10,7 +15,19 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 import os
 
 from django.core.asgi import get_asgi_application
+from django.core.exceptions import ImproperlyConfigured
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'edux.settings')
 
+# Persistent connections leak under ASGI: sync code runs on changing
+# threads, each keeping its own connection open (Django ticket #33497).
+os.environ.setdefault('DB_POOL_MODE', 'none')
+if os.environ['DB_POOL_MODE'] == 'persistent':
+    raise ImproperlyConfigured('DB_POOL_MODE "persistent" is for WSGI only; use "none" or "pool" under ASGI.')
+
 application = get_asgi_application()
+
+# Workers forked from a preloading master must not reuse its connections.
+from edux.db import reset_after_fork  # noqa: E402
+
+os.register_at_fork(after_in_child=reset_after_fork)
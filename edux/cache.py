@@ -0,0 +1,59 @@
+import threading
+import time
+from collections import OrderedDict
+
+from edux.metrics import Counter, register
+
+CACHE_REQUESTS = register(Counter(
+    "edux_local_cache_requests_total", "In-process cache lookups, by cache and result.", ("cache", "result"),
+))
+
+
+class TTLCache:
+    """
+    Thread-safe in-process LRU cache whose entries also expire ``ttl``
+    seconds after they were stored. Hits and misses are counted per
+    ``name`` on /metrics.
+    """
+
+    def __init__(self, name, maxsize, ttl):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            hit = entry is not None and entry[0] > now
+            if hit:
+                self.entries.move_to_end(key)
+                self.hits += 1
+            else:
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+        CACHE_REQUESTS.inc(self.name, "hit" if hit else "miss")
+        return entry[1] if hit else default
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,79 @@
+"""
+Database connection statistics and fork safety.
+
+``DB_POOL_MODE`` (see settings) decides how connections are reused. This
+module exports what that reuse achieves on /metrics: how many connections
+each process set up, and the psycopg pool's own statistics in pool mode.
+
+Connections and pools must not be shared across ``fork()``: the child
+would talk over the parent's sockets, and a pool's worker threads do not
+survive it. ``reset_after_fork`` makes a forked worker, e.g. a gunicorn
+worker forked from a ``--preload`` master, start with none.
+"""
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from edux.metrics import Counter, format_labels, register
+
+CONNECTIONS = register(Counter(
+    "edux_db_connections_total",
+    "Database connections set up, or checked out of the pool in pool mode, by alias.",
+    ("alias",),
+))
+
+
+def count_connection(sender, connection, **kwargs):
+    CONNECTIONS.inc(connection.alias)
+
+
+connection_created.connect(count_connection, dispatch_uid="edux.db.count_connection")
+
+
+def open_pools():
+    from django.db.backends.postgresql.base import DatabaseWrapper
+    return sorted(DatabaseWrapper._connection_pools.items())
+
+
+class PoolStats:
+    """
+    The psycopg pool statistics of this process, read when /metrics is
+    scraped.
+    """
+
+    GAUGES = [
+        ("pool_min", "edux_db_pool_min_size", "Connections the pool keeps open at least."),
+        ("pool_max", "edux_db_pool_max_size", "Connections the pool may open at most."),
+        ("pool_size", "edux_db_pool_size", "Connections currently managed by the pool."),
+        ("pool_available", "edux_db_pool_available", "Idle connections in the pool."),
+        ("requests_waiting", "edux_db_pool_requests_waiting", "Requests waiting for a connection."),
+    ]
+    COUNTERS = [
+        ("requests_num", "edux_db_pool_requests_total", "Connections requested from the pool."),
+        ("requests_queued", "edux_db_pool_requests_queued_total", "Requests that had to wait for a connection."),
+        ("requests_wait_ms", "edux_db_pool_wait_milliseconds_total", "Time spent waiting for a connection."),
+        ("requests_errors", "edux_db_pool_request_errors_total", "Requests that timed out or failed."),
+        ("connections_lost", "edux_db_pool_connections_lost_total", "Connections found broken by the health check."),
+    ]
+
+    def collect(self):
+        stats = [(alias, pool.get_stats()) for alias, pool in open_pools()]
+        if not stats:
+            return
+        for kind, metrics in (("gauge", self.GAUGES), ("counter", self.COUNTERS)):
+            for key, name, documentation in metrics:
+                yield f"# HELP {name} {documentation}"
+                yield f"# TYPE {name} {kind}"
+                for alias, values in stats:
+                    yield f"{name}{format_labels(('alias',), (alias,))} {values.get(key, 0)}"
+
+
+register(PoolStats())
+
+
+def reset_after_fork():
+    # Forget, without closing, whatever the parent had open: closing would
+    # end the parent's sessions over the shared sockets.
+    for connection in connections.all(initialized_only=True):
+        connection.connection = None
+    from django.db.backends.postgresql.base import DatabaseWrapper
+    DatabaseWrapper._connection_pools.clear()
@@ -0,0 +1,29 @@
+import atexit
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+
+class BackgroundStreamHandler(QueueHandler):
+    """
+    Formats records on the calling thread and writes them to the stream
+    from a background thread, so a slow console never blocks a request.
+
+    Threads do not survive ``fork()``, so a forked child (e.g. a gunicorn
+    worker of a ``--preload`` master) starts its own queue and listener.
+    """
+
+    def __init__(self, stream=None):
+        super().__init__(queue.SimpleQueue())
+        self.stream = stream
+        self.start()
+        os.register_at_fork(after_in_child=self.start)
+
+    def start(self):
+        # A fresh queue, since records the parent had not written yet
+        # would otherwise be written twice.
+        self.queue = queue.SimpleQueue()
+        self.listener = QueueListener(self.queue, logging.StreamHandler(self.stream))
+        self.listener.start()
+        atexit.register(self.listener.stop)
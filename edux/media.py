@@ -0,0 +1,174 @@
+"""
+Access-checked delivery of uploaded media.
+
+Catalog images and avatars are public. Application documents, and the
+deduplicated blobs they point at, are readable by their owner and by
+staff. Anything else under ``MEDIA_ROOT``, such as upload chunks, is not
+served.
+
+Once a request is allowed, ``MEDIA_SENDFILE_BACKEND`` decides who sends
+the bytes. With ``x-accel-redirect`` (nginx) or ``x-sendfile`` (Apache,
+lighttpd) the view returns headers only and the web server streams the
+file, honouring Range and conditional requests itself. Without a
+backend, Django serves the file with single-range and conditional GET
+support.
+"""
+import mimetypes
+import os
+import re
+from pathlib import Path
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, SuspiciousFileOperation
+from django.db.models import Q
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.permissions import AllowAny
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from applications.models import Application, UploadSession
+
+SENDFILE_BACKENDS = ("", "x-accel-redirect", "x-sendfile")
+if settings.MEDIA_SENDFILE_BACKEND not in SENDFILE_BACKENDS:
+    raise ImproperlyConfigured(f"MEDIA_SENDFILE_BACKEND must be one of {SENDFILE_BACKENDS}.")
+
+PUBLIC_PREFIXES = ("thumbnails/", "images/", "avatar/")
+DOCUMENT_PREFIXES = ("education_docs/", "recommendation_letter/", "blobs/")
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+
+
+def can_read(user, name):
+    if name.startswith(PUBLIC_PREFIXES):
+        return True
+    if not name.startswith(DOCUMENT_PREFIXES) or not user.is_authenticated:
+        return False
+    if user.is_staff:
+        return True
+    owned = Application.objects.filter(
+        Q(education_document=name) | Q(recommendation_letter=name), user=user,
+    ).exists()
+    if not owned and name.startswith("blobs/"):
+        owned = UploadSession.objects.filter(user=user, blob__file=name).exists()
+    return owned
+
+
+def resolve(name):
+    """
+    The absolute path of media file ``name`` and its normalised name;
+    raises Http404 for names outside ``MEDIA_ROOT``, inside the upload
+    chunk directory or missing.
+    """
+    try:
+        path = Path(safe_join(settings.MEDIA_ROOT, name))
+    except SuspiciousFileOperation:
+        raise Http404
+    if path.is_relative_to(os.path.abspath(settings.UPLOAD_CHUNK_ROOT)) or not path.is_file():
+        raise Http404
+    return path, path.relative_to(os.path.abspath(settings.MEDIA_ROOT)).as_posix()
+
+
+def parse_range(header, size):
+    """
+    ``(start, end)`` of a single byte range, inclusive; None to send the
+    whole file, or ValueError when the range cannot be satisfied.
+
+    An invalid spec such as ``bytes=10-5`` is ignored (RFC 9110 14.2),
+    while a start at or past the end of the file is unsatisfiable.
+    """
+    match = RANGE_RE.match(header.strip())
+    if match is None:
+        # Malformed or multiple ranges: ignore them and send everything.
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        raise ValueError
+    return start, end
+
+
+def read_range(path, start, length):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            data = f.read(min(CHUNK_SIZE, length))
+            if not data:
+                return
+            length -= len(data)
+            yield data
+
+
+def serve_local(request, path, etag, last_modified):
+    size = path.stat().st_size
+    header = request.META.get("HTTP_RANGE")
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if header and if_range:
+        # A changed file invalidates the range; send it whole instead.
+        if if_range.startswith(("\"", "W/")):
+            if etag not in parse_etags(if_range):
+                header = None
+        elif parse_http_date_safe(if_range) != last_modified:
+            header = None
+    try:
+        byte_range = parse_range(header, size) if header else None
+    except ValueError:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    if byte_range is None:
+        response = FileResponse(open(path, "rb"))
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(read_range(path, start, end - start + 1), status=206)
+        response["Content-Length"] = end - start + 1
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Type"] = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+class MediaView(APIView):
+    # Session authentication lets staff open documents linked from the admin.
+    authentication_classes = [*api_settings.DEFAULT_AUTHENTICATION_CLASSES, SessionAuthentication]
+    permission_classes = [AllowAny]
+
+    def get(self, request, name):
+        # Check the normalised name, so "avatar/../blobs/..." is a blob.
+        path, name = resolve(name)
+        if not can_read(request.user, name):
+            raise Http404
+
+        backend = settings.MEDIA_SENDFILE_BACKEND
+        if backend:
+            response = HttpResponse(content_type=mimetypes.guess_type(path.name)[0] or "application/octet-stream")
+            if backend == "x-accel-redirect":
+                response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_PREFIX.rstrip("/") + "/" + quote(name)
+            else:
+                response["X-Sendfile"] = os.fspath(path)
+        else:
+            stat = path.stat()
+            etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+            last_modified = int(stat.st_mtime)
+            response = get_conditional_response(request, etag, last_modified)
+            if response is None:
+                response = serve_local(request, path, etag, last_modified)
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(last_modified)
+        if not name.startswith(PUBLIC_PREFIXES):
+            response["Cache-Control"] = "private, no-cache"
+        return response
@@ -0,0 +1,280 @@
+"""
+Per-request performance instrumentation.
+
+``MetricsMiddleware`` opens a collector for every request. SQL statements
+are timed by a database execute wrapper, and other phases (serialization,
+outbound LLM calls) are timed with ``timed()``. When the response goes
+out, the totals are written to a ``Server-Timing`` header and one
+structured log line, and they are folded into in-process histograms that
+``metrics_view`` renders in the Prometheus text format.
+"""
+import bisect
+import hmac
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+
+logger = logging.getLogger(__name__)
+
+PHASES = ("db", "serialize", "llm")
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations = dict.fromkeys(PHASES, 0.0)
+        self.queries = 0
+        self.active = set()
+        self.lock = threading.Lock()
+
+    def add(self, phase, duration):
+        with self.lock:
+            self.durations[phase] = self.durations.get(phase, 0.0) + duration
+
+
+_current = ContextVar("request_metrics", default=None)
+
+
+@contextmanager
+def timed(phase):
+    """
+    Add the time spent in the block to ``phase`` of the current request.
+    Nested blocks of the same phase are only counted once.
+    """
+    metrics = _current.get()
+    if metrics is None or phase in metrics.active:
+        yield
+        return
+    metrics.active.add(phase)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.active.discard(phase)
+        metrics.add(phase, time.perf_counter() - started)
+
+
+class TimedSerializerMixin:
+    """
+    Counts ``to_representation`` towards the request's ``serialize`` time.
+    """
+
+    def to_representation(self, instance):
+        with timed("serialize"):
+            return super().to_representation(instance)
+
+
+def query_timer(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add("db", time.perf_counter() - started)
+        with metrics.lock:
+            metrics.queries += 1
+
+
+def install_query_timer(sender, connection, **kwargs):
+    # The wrapper list lives on the connection wrapper, which survives
+    # reconnects, so only add the timer once.
+    if query_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_timer)
+
+
+connection_created.connect(install_query_timer, dispatch_uid="edux.metrics.install_query_timer")
+
+
+class Histogram:
+    def __init__(self, name, documentation, buckets, labels):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.labels = labels
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+
+    def collect(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self.lock:
+            series = [(labels, list(counts), total) for labels, (counts, total) in self.series.items()]
+        for labels, counts, total in sorted(series):
+            label_text = format_labels(self.labels, labels)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                bucket_labels = format_labels((*self.labels, "le"), (*labels, str(bound)))
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            yield f"{self.name}_sum{label_text} {total}"
+            yield f"{self.name}_count{label_text} {cumulative}"
+
+
+class Counter:
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self.lock:
+            self.series[labels] = self.series.get(labels, 0) + amount
+
+    def collect(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        with self.lock:
+            series = sorted(self.series.items())
+        for labels, value in series:
+            yield f"{self.name}{format_labels(self.labels, labels)} {value}"
+
+
+def format_labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{escape_label(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+REGISTRY = []
+
+
+def register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+REQUESTS = register(Counter(
+    "edux_requests_total", "Requests handled, by route and status.", ("route", "method", "status"),
+))
+REQUEST_DURATION = register(Histogram(
+    "edux_request_duration_seconds", "Total request latency.",
+    DURATION_BUCKETS, ("route", "method"),
+))
+REQUEST_QUERIES = register(Histogram(
+    "edux_request_db_queries", "SQL statements executed per request.",
+    QUERY_BUCKETS, ("route", "method"),
+))
+PHASE_DURATION = register(Histogram(
+    "edux_request_phase_duration_seconds", "Time per request spent in SQL, serialization and LLM calls.",
+    DURATION_BUCKETS, ("route", "method", "phase"),
+))
+
+
+def route_of(request):
+    match = getattr(request, "resolver_match", None)
+    return match.route if match is not None else "<unmatched>"
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Connections opened before the middleware was loaded missed the signal.
+        for connection in connections.all(initialized_only=True):
+            install_query_timer(None, connection)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.finish(request, response, metrics)
+        return response
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.finish(request, response, metrics)
+        return response
+
+    def finish(self, request, response, metrics):
+        # Streaming responses are measured up to the first byte.
+        total = time.perf_counter() - metrics.started
+        route = route_of(request)
+        method = request.method
+
+        REQUESTS.inc(route, method, str(response.status_code))
+        REQUEST_DURATION.observe(total, route, method)
+        REQUEST_QUERIES.observe(metrics.queries, route, method)
+        for phase, duration in metrics.durations.items():
+            PHASE_DURATION.observe(duration, route, method, phase)
+
+        timings = [
+            f'db;dur={metrics.durations["db"] * 1000:.1f};desc="{metrics.queries} queries"',
+            f'serialize;dur={metrics.durations["serialize"] * 1000:.1f}',
+        ]
+        if metrics.durations["llm"]:
+            timings.append(f'llm;dur={metrics.durations["llm"] * 1000:.1f}')
+        timings.append(f"total;dur={total * 1000:.1f}")
+        response["Server-Timing"] = ", ".join(timings)
+
+        fields = {
+            "method": method,
+            "route": route,
+            "status": response.status_code,
+            "duration_ms": round(total * 1000, 1),
+            "db_queries": metrics.queries,
+            **{f"{phase}_ms": round(duration * 1000, 1) for phase, duration in metrics.durations.items()},
+        }
+        logger.info(
+            " ".join(f"{key}={value}" for key, value in fields.items()),
+            extra={"metrics": fields},
+        )
+
+
+def metrics_view(request):
+    """
+    Prometheus text exposition of the histograms and counters of this
+    process, for scrapers sending ``Authorization: Bearer <METRICS_TOKEN>``.
+    Without a token configured the endpoint is off.
+
+    Numbers are per process: behind several gunicorn workers, each scrape
+    reports only the worker that answered it.
+    """
+    token = settings.METRICS_TOKEN
+    supplied = request.META.get("HTTP_AUTHORIZATION", "").removeprefix("Bearer ")
+    if not token or not hmac.compare_digest(supplied.encode(), token.encode()):
+        return HttpResponseForbidden()
+    lines = [line for metric in REGISTRY for line in metric.collect()]
+    return HttpResponse("\n".join(lines) + "\n", content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,121 @@
+"""
+Read-replica routing for the university catalog.
+
+``ReplicaMiddleware`` marks safe-method requests as allowed to read from a
+replica, and ``ReplicaRouter`` then sends reads of the catalog models to a
+``DB_REPLICA_HOSTS`` entry picked at random once per request. Everything else reads and writes the
+primary, as do management commands and background workers.
+
+Reads stay on the primary for ``DB_REPLICA_STICKY_SECONDS``:
+
+* for a user who has just written, via a per-user marker in the shared
+  cache, so they read their own writes;
+* for everyone after the catalog changed, so a lagging replica cannot
+  put old rows in the caches keyed by the new catalog version.
+
+Both are only checked when a request actually reads the catalog.
+"""
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from universities.cache import catalog_recently_changed
+
+REPLICAS = [alias for alias in settings.DATABASES if alias != "default"]
+REPLICATED_MODELS = {"universities.university", "universities.faculty",
+                     "universities.division", "universities.gallery"}
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# The safe-method request being handled, if it may use a replica.
+_request = ContextVar("edux_replica_request", default=None)
+
+
+def sticky_key(user_id):
+    return f"edux:primary:{user_id}"
+
+
+def pinned_to_primary(request):
+    # Looked up at the first catalog read, when DRF has authenticated the
+    # user (it sets request.user on the underlying Django request too).
+    pinned = getattr(request, "_pinned_to_primary", None)
+    if pinned is None:
+        user = getattr(request, "user", None)
+        pinned = bool(
+            catalog_recently_changed()
+            or (user is not None and user.is_authenticated and cache.get(sticky_key(user.pk)))
+        )
+        request._pinned_to_primary = pinned
+    return pinned
+
+
+def replica_for(request):
+    # One replica for the whole request, so its reads see a single snapshot
+    # of replication and reuse one connection.
+    replica = getattr(request, "_replica", None)
+    if replica is None:
+        replica = request._replica = random.choice(REPLICAS)
+    return replica
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        request = _request.get()
+        if (request is not None and model._meta.label_lower in REPLICATED_MODELS
+                and not pinned_to_primary(request)):
+            return replica_for(request)
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
+
+
+class ReplicaMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = _request.set(self.replica_request(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _request.reset(token)
+        self.stick(request, response)
+        return response
+
+    async def __acall__(self, request):
+        token = _request.set(self.replica_request(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request.reset(token)
+        # request.user may still be a lazy session lookup.
+        await sync_to_async(self.stick)(request, response)
+        return response
+
+    def replica_request(self, request):
+        return request if REPLICAS and request.method in SAFE_METHODS else None
+
+    def stick(self, request, response):
+        if not REPLICAS or request.method in SAFE_METHODS or response.status_code >= 400:
+            return
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            cache.set(sticky_key(user.pk), True, settings.DB_REPLICA_STICKY_SECONDS)
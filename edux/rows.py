@@ -0,0 +1,65 @@
+"""
+Line-numbered reading of CSV and JSONL uploads for the bulk importers.
+
+Rows come out as ``(line_number, row)`` pairs. A line that cannot be
+parsed is yielded as a ``RowError`` in place of the row, so importers
+report it against its line and carry on with the rest of the file.
+"""
+import csv
+import json
+
+LIST_SEPARATOR = "|"
+
+
+class RowError(ValueError):
+    pass
+
+
+def detect_format(name, fmt=None):
+    if fmt:
+        return fmt
+    return "csv" if str(name).endswith(".csv") else "jsonl"
+
+
+def read_rows(stream, fmt, lists=()):
+    """
+    Yield ``(line_number, row)`` pairs from a CSV or JSONL stream. CSV
+    columns named in ``lists`` hold ``LIST_SEPARATOR``-separated values
+    and are split into lists, as JSONL would carry them.
+    """
+    if fmt == "csv":
+        yield from read_csv(stream, lists)
+    else:
+        yield from read_jsonl(stream)
+
+
+def read_csv(stream, lists):
+    reader = csv.DictReader(stream)
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as exc:
+            # DictReader only updates its line_num on success. The csv
+            # reader resumes at the next line after a malformed one.
+            yield reader.reader.line_num, RowError(f"not valid CSV: {exc}")
+            continue
+        for key in lists:
+            if row.get(key) is not None:
+                row[key] = [value for value in row[key].split(LIST_SEPARATOR) if value]
+        yield reader.line_num, row
+
+
+def read_jsonl(stream):
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = RowError("not valid JSON")
+        else:
+            if not isinstance(row, dict):
+                row = RowError("expected a JSON object")
+        yield line_number, row
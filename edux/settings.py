@@ -14,6 +14,8 @@ from pathlib import Path
 import environ
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Initialise environment variables
 env = environ.Env(
     # set casting, default value
@@ -46,6 +48,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'corsheaders',
@@ -55,6 +58,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'edux.metrics.MetricsMiddleware',
+    'edux.routers.ReplicaMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -101,6 +106,134 @@ DATABASES = {
     }
 }
 
+# Database connection reuse. DB_POOL_MODE is "none" (a new connection per
+# request), "persistent" (each worker thread keeps its connection for
+# DB_CONN_MAX_AGE seconds, checked before reuse; WSGI only) or "pool" (a
+# psycopg 3 pool per process; needs the optional psycopg[pool] package).
+# edux.asgi defaults to "none" and refuses "persistent". Pool and
+# connection statistics are exported on /metrics by edux.db.
+DB_POOL_MODE = env('DB_POOL_MODE', default='persistent')
+if DB_POOL_MODE == 'persistent':
+    DATABASES['default']['CONN_MAX_AGE'] = env.int('DB_CONN_MAX_AGE', default=60)
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+elif DB_POOL_MODE == 'pool':
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': env.int('DB_POOL_MIN_SIZE', default=2),
+            'max_size': env.int('DB_POOL_MAX_SIZE', default=10),
+            # Seconds a request waits for a free connection before failing
+            'timeout': env.float('DB_POOL_TIMEOUT', default=10),
+        },
+    }
+elif DB_POOL_MODE != 'none':
+    raise ImproperlyConfigured('DB_POOL_MODE must be one of "none", "persistent" or "pool".')
+
+# Read replicas ("host" or "host:port"), used by edux.routers for catalog
+# reads on safe requests. After a user writes, or after the catalog
+# changes, reads stay on the primary for DB_REPLICA_STICKY_SECONDS so they
+# see the change despite replication lag.
+DB_REPLICA_HOSTS = env.list('DB_REPLICA_HOSTS', default=[])
+DB_REPLICA_STICKY_SECONDS = env.int('DB_REPLICA_STICKY_SECONDS', default=10)
+for number, replica in enumerate(DB_REPLICA_HOSTS, start=1):
+    host, _, port = replica.partition(':')
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'OPTIONS': {**DATABASES['default'].get('OPTIONS', {})},
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['edux.routers.ReplicaRouter']
+
+# Cache configuration. The catalog version, and with it every catalog and
+# recommendation cache, is invalidated through this cache by whichever
+# process changed the data: web workers, import_catalog,
+# build_image_variants. It must therefore be shared by all processes
+# (redis://, memcached or dbcache://); the in-process default is only
+# accepted with DEBUG.
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+if not DEBUG and CACHES['default']['BACKEND'] in (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+):
+    raise ImproperlyConfigured('CACHE_URL must point at a cache shared by all processes when DEBUG is off.')
+
+# Seconds a serialized catalog response stays cached for a given catalog version
+CATALOG_CACHE_TIMEOUT = env.int('CATALOG_CACHE_TIMEOUT', default=60 * 60)
+
+# Resized WebP/JPEG derivatives built for University thumbnails and Gallery
+# images. IMAGE_VARIANT_WORKERS=0 builds them inline instead of on a pool.
+IMAGE_VARIANT_WIDTHS = (320, 640, 1280)
+IMAGE_VARIANT_WORKERS = env.int('IMAGE_VARIANT_WORKERS', default=2)
+
+# Resumable application document uploads. Chunks are kept outside MEDIA_ROOT
+# until the upload is complete.
+UPLOAD_CHUNK_ROOT = env('UPLOAD_CHUNK_ROOT', default=str(BASE_DIR / 'upload_chunks'))
+UPLOAD_CHUNK_SIZE = 5 * 1024 * 1024
+UPLOAD_CHUNK_MAX_SIZE = 16 * 1024 * 1024
+UPLOAD_MAX_SIZE = env.int('UPLOAD_MAX_SIZE', default=200 * 1024 * 1024)
+
+# Faculty recommendations. RECOMMEND_ENGINE is "llm" (model picks from the
+# whole catalog), "local" (TF-IDF index only) or "local+llm" (the model
+# re-ranks the local candidates).
+RECOMMEND_ENGINE = env('RECOMMEND_ENGINE', default='llm')
+RECOMMEND_RESULTS = 5
+RECOMMEND_RERANK_CANDIDATES = env.int('RECOMMEND_RERANK_CANDIDATES', default=20)
+RECOMMEND_MODEL = env('RECOMMEND_MODEL', default='gpt-5')
+# Seconds before a model call is abandoned, and how many calls one ASGI
+# process lets run at once before answering 503 with Retry-After.
+RECOMMEND_TIMEOUT = env.float('RECOMMEND_TIMEOUT', default=30)
+RECOMMEND_MAX_CONCURRENCY = env.int('RECOMMEND_MAX_CONCURRENCY', default=20)
+RECOMMEND_RETRY_AFTER = 5
+# Threads a batch recommendation request uses for its model calls
+RECOMMEND_BATCH_WORKERS = env.int('RECOMMEND_BATCH_WORKERS', default=8)
+# Queued recommendation jobs (run_recommendation_workers): attempts before a
+# job fails, retry backoff bounds and how long a worker's claim lasts, all
+# in seconds.
+RECOMMEND_JOB_MAX_ATTEMPTS = 5
+RECOMMEND_JOB_RETRY_DELAY = 2
+RECOMMEND_JOB_RETRY_MAX_DELAY = 5 * 60
+RECOMMEND_JOB_LEASE = env.int('RECOMMEND_JOB_LEASE', default=5 * 60)
+RECOMMEND_CACHE_SIZE = env.int('RECOMMEND_CACHE_SIZE', default=1024)
+RECOMMEND_CACHE_TIMEOUT = env.int('RECOMMEND_CACHE_TIMEOUT', default=60 * 60)
+
+# Processes hashing passwords for the staff bulk user upload, shared by
+# all requests of a web worker
+PROVISION_API_WORKERS = env.int('PROVISION_API_WORKERS', default=2)
+
+# Authenticated users are resolved from an in-process cache for this many
+# seconds (accounts.authentication); optionally with their profile.
+JWT_USER_CACHE_SIZE = env.int('JWT_USER_CACHE_SIZE', default=10000)
+JWT_USER_CACHE_TIMEOUT = env.int('JWT_USER_CACHE_TIMEOUT', default=60)
+JWT_USER_CACHE_PROFILE = env.bool('JWT_USER_CACHE_PROFILE', default=False)
+# Seconds a user's serialized profile stays in the shared cache; saving the
+# user or profile drops it sooner.
+USER_PROFILE_CACHE_TIMEOUT = env.int('USER_PROFILE_CACHE_TIMEOUT', default=15 * 60)
+
+# Bearer token the Prometheus scraper sends to /metrics; the endpoint is
+# off while it is empty. Client addresses are no proof behind a proxy.
+METRICS_TOKEN = env('METRICS_TOKEN', default='')
+
+# Application logs, including one structured line per request from
+# edux.metrics, are written to stderr from a background thread.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'plain': {'format': '%(asctime)s %(levelname)s %(name)s %(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'edux.logs.BackgroundStreamHandler', 'formatter': 'plain'},
+    },
+    'loggers': {
+        name: {'handlers': ['console'], 'level': env('LOG_LEVEL', default='INFO'), 'propagate': False}
+        for name in ('edux', 'accounts', 'universities', 'applications')
+    },
+}
+
 AUTH_USER_MODEL = "accounts.CustomUser"
 
 # Password validation
@@ -135,7 +268,7 @@ USE_TZ = True
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
@@ -169,6 +302,11 @@ CORS_ALLOW_ALL_ORIGINS = True
 STATIC_URL = f'{BASE_DIR}static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Media is served by edux.media after an access check. With
+# "x-accel-redirect" (nginx, internal location at MEDIA_ACCEL_PREFIX) or
+# "x-sendfile" the web server sends the file; empty sends it from Django.
+MEDIA_SENDFILE_BACKEND = env('MEDIA_SENDFILE_BACKEND', default='')
+MEDIA_ACCEL_PREFIX = env('MEDIA_ACCEL_PREFIX', default='/protected-media/')
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'edux.settings')
 
 application = get_wsgi_application()
+
+# Workers forked from a preloading master must not reuse its connections.
+from edux.db import reset_after_fork  # noqa: E402
+
+os.register_at_fork(after_in_child=reset_after_fork)
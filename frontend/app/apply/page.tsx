@@ -11,7 +11,7 @@ import { Textarea } from "@/components/ui/textarea"
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@/components/ui/select"
 import { Header } from "@/components/header"
 import { Footer } from "@/components/footer"
-import { getUniversities } from "@/lib/data/universities"
+import { getMoreUniversities, getUniversities } from "@/lib/data/universities"
 import { UniversityFull } from "@/universities/[id]/page"
 import { FileText, Upload, CheckCircle } from "lucide-react"
 import { createApplication } from "@/lib/data/applications"
@@ -31,17 +31,26 @@ export default function ApplyPage() {
   const [isLoading, setIsLoading] = useState(false)
   const [isSubmitted, setIsSubmitted] = useState(false)
   const [universities, setUniversities] = useState<UniversityFull[]>([]);
+  const [nextUniversities, setNextUniversities] = useState<string | null>(null);
   useEffect(() => {
     (async () => {
       try {
-        const data = await getUniversities();
-        setUniversities(data);
+        const page = await getUniversities("name");
+        setUniversities(page.results);
+        setNextUniversities(page.next);
       } catch (e) {
         console.error("Failed to load universities:", e);
       }
     })();
   }, []);
 
+  const loadMoreUniversities = async () => {
+    if (!nextUniversities) return;
+    const page = await getMoreUniversities(nextUniversities);
+    setUniversities((current) => [...current, ...page.results]);
+    setNextUniversities(page.next);
+  };
+
   const selectedUniversity = universities.find((uni) => uni.id === formData.university_id)
 
   const handleSubmit = async (e: React.FormEvent) => {
@@ -159,6 +168,11 @@ export default function ApplyPage() {
                       ))}
                     </SelectContent>
                   </Select>
+                  {nextUniversities && (
+                    <Button type="button" variant="link" size="sm" className="px-0" onClick={loadMoreUniversities}>
+                      Load more universities
+                    </Button>
+                  )}
                 </div>
 
                 {/* Target Program */}
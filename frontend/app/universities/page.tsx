@@ -1,61 +1,61 @@
 "use client";
 
-import { useState, useMemo, useEffect } from "react";
+import { useState, useEffect } from "react";
 import { Input } from "@/components/ui/input";
 import { Button } from "@/components/ui/button";
 import { Header } from "@/components/header";
 import { Footer } from "@/components/footer";
 import { UniversityCard } from "@/components/university-card";
-import { getUniversities, University } from "@/lib/data/universities";
+import {
+  getMoreUniversities,
+  searchUniversities,
+  University,
+  UniversityOrdering,
+} from "@/lib/data/universities";
 import { Search } from "lucide-react";
 
 export default function UniversitiesPage() {
   const [searchQuery, setSearchQuery] = useState("");
-  const [sortBy, setSortBy] = useState<"name" | "ranking" | "students">(
-    "ranking"
-  );
+  const [sortBy, setSortBy] = useState<UniversityOrdering>("ranking");
   const [universities, setUniversities] = useState<University[]>([]);
+  const [next, setNext] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
 
-  // Load universities on component mount
+  // Search and sort server-side; load the first page only.
   useEffect(() => {
     let cancelled = false;
-    (async () => {
+    const timer = setTimeout(async () => {
       try {
         setLoading(true);
-        const data = await getUniversities();
-        if (!cancelled) setUniversities(data);
+        const page = await searchUniversities(searchQuery.trim(), sortBy);
+        if (!cancelled) {
+          setUniversities(page.results);
+          setNext(page.next);
+        }
       } catch (e) {
         console.error("Failed to load universities:", e);
       } finally {
         if (!cancelled) setLoading(false);
       }
-    })();
+    }, 300);
     return () => {
       cancelled = true;
+      clearTimeout(timer);
     };
-  }, []);
+  }, [searchQuery, sortBy]);
 
-  const filteredAndSortedUniversities = useMemo(() => {
-    const filtered = universities.filter(
-      (uni) =>
-        !searchQuery ||
-        uni.name.toLowerCase().includes(searchQuery.toLowerCase()) ||
-        uni.location.toLowerCase().includes(searchQuery.toLowerCase())
-    );
-    return filtered.sort((a, b) => {
-      switch (sortBy) {
-        case "name":
-          return a.name.localeCompare(b.name);
-        case "ranking":
-          return (a.ranking ?? 999) - (b.ranking ?? 999);
-        case "students":
-          return b.students - a.students;
-        default:
-          return 0;
-      }
-    });
-  }, [universities, searchQuery, sortBy]);
+  const loadMore = async () => {
+    if (!next) return;
+    setLoadingMore(true);
+    try {
+      const page = await getMoreUniversities(next);
+      setUniversities((current) => [...current, ...page.results]);
+      setNext(page.next);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
   return (
     <div className="min-h-screen flex flex-col">
@@ -102,11 +102,11 @@ export default function UniversitiesPage() {
                 Name
               </Button>
               <Button
-                variant={sortBy === "students" ? "default" : "outline"}
-                onClick={() => setSortBy("students")}
+                variant={sortBy === "established" ? "default" : "outline"}
+                onClick={() => setSortBy("established")}
                 size="sm"
               >
-                Size
+                Oldest
               </Button>
             </div>
           </div>
@@ -114,20 +114,29 @@ export default function UniversitiesPage() {
           {/* Results Count */}
           <div className="mb-6">
             <p className="text-muted-foreground">
-              Showing {filteredAndSortedUniversities.length} of{" "}
-              {universities.length} universities
+              Showing {universities.length}
+              {next ? "+" : ""} universities
             </p>
           </div>
 
           {/* Universities Grid */}
           <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-            {filteredAndSortedUniversities.map((university) => (
+            {universities.map((university) => (
               <UniversityCard key={university.id} university={university} />
             ))}
           </div>
 
+          {/* Load More */}
+          {next && (
+            <div className="text-center mt-8">
+              <Button onClick={loadMore} disabled={loadingMore} variant="outline">
+                {loadingMore ? "Loading..." : "Load more"}
+              </Button>
+            </div>
+          )}
+
           {/* No Results */}
-          {filteredAndSortedUniversities.length === 0 && (
+          {!loading && universities.length === 0 && (
             <div className="text-center py-12">
               <p className="text-muted-foreground text-lg mb-4">
                 No universities found matching your search.
@@ -13,11 +13,19 @@ export function UniversityCard({ university }: UniversityCardProps) {
     <Link href={`/universities/${university.id}`}>
       <Card className="group hover:shadow-lg transition-all duration-200 cursor-pointer">
         <div className="aspect-video relative overflow-hidden rounded-t-lg">
-          <img
-            src={university.thumbnail || "/placeholder.svg"}
-            alt={university.name}
-            className="w-full h-full object-cover group-hover:scale-105 transition-transform duration-200"
-          />
+          <picture>
+            {university.thumbnail_variants?.webp && (
+              <source type="image/webp" srcSet={university.thumbnail_variants.webp.srcset} sizes="(min-width: 768px) 33vw, 100vw" />
+            )}
+            <img
+              src={university.thumbnail || "/placeholder.svg"}
+              srcSet={university.thumbnail_variants?.jpeg?.srcset}
+              sizes="(min-width: 768px) 33vw, 100vw"
+              alt={university.name}
+              loading="lazy"
+              className="w-full h-full object-cover group-hover:scale-105 transition-transform duration-200"
+            />
+          </picture>
           {university.ranking && <Badge className="absolute top-2 right-2 bg-primary">#{university.ranking}</Badge>}
         </div>
 
@@ -17,7 +17,14 @@ export interface Application {
 // API functions for applications
 export async function getApplications(): Promise<Application[]> {
   try {
-    const applications = await apiClient.get('/v1/applications/');
+    // The list is cursor-paginated; follow `next` until the last page.
+    const applications: Application[] = [];
+    let endpoint: string | null = '/v1/applications/';
+    while (endpoint) {
+      const page = await apiClient.get(endpoint);
+      applications.push(...page.results);
+      endpoint = page.next ? page.next.slice(page.next.indexOf('/v1/')) : null;
+    }
     return applications;
   } catch (error) {
     console.error('Failed to fetch applications:', error);
@@ -1,23 +1,54 @@
 import apiClient from '../api'
 
+export interface ImageVariants {
+  [format: string]: {
+    srcset: string
+    images: { url: string; width: number; height: number }[]
+  }
+}
+
 export interface University {
   id: number
   name: string
   thumbnail: string | null
+  thumbnail_variants?: ImageVariants
   location: string
   established: number
   students: number
   ranking: number
+  faculty_count?: number
+}
+
+export type UniversityOrdering = 'ranking' | 'name' | 'established'
+
+export interface UniversityPage {
+  results: University[]
+  next: string | null
+}
+
+// The catalog is cursor-paginated. Callers render one page and pass the
+// returned `next` back in only when the user asks for more.
+async function getPage(endpoint: string): Promise<UniversityPage> {
+  const page = await apiClient.get(endpoint);
+  return { results: page.results, next: page.next ? page.next.slice(page.next.indexOf('/v1/')) : null };
 }
 
 // API functions for universities
-export async function getUniversities(): Promise<University[]> {
+export async function getUniversities(ordering: UniversityOrdering = 'ranking'): Promise<UniversityPage> {
   try {
-    const universities = await apiClient.get('/v1/universities/');
-    return universities;
+    return await getPage(`/v1/universities/?ordering=${ordering}`);
   } catch (error) {
     console.error('Failed to fetch universities:', error);
-    return [];
+    return { results: [], next: null };
+  }
+}
+
+export async function getMoreUniversities(next: string): Promise<UniversityPage> {
+  try {
+    return await getPage(next);
+  } catch (error) {
+    console.error('Failed to fetch more universities:', error);
+    return { results: [], next };
   }
 }
 
@@ -31,19 +62,13 @@ export async function getUniversityById(id: number): Promise<University | null>
   }
 }
 
-export async function searchUniversities(query: string): Promise<University[]> {
+export async function searchUniversities(query: string, ordering: UniversityOrdering = 'ranking'): Promise<UniversityPage> {
   try {
-    const universities = await getUniversities();
-    if (!query) return universities;
-
-    const lowercaseQuery = query.toLowerCase();
-    return universities.filter(
-      (uni) =>
-        uni.name.toLowerCase().includes(lowercaseQuery) ||
-        uni.location.toLowerCase().includes(lowercaseQuery)
-    );
+    if (!query) return getUniversities(ordering);
+    // Matching happens server-side against name, location and faculty names.
+    return await getPage(`/v1/universities/?search=${encodeURIComponent(query)}&ordering=${ordering}`);
   } catch (error) {
     console.error('Failed to search universities:', error);
-    return [];
+    return { results: [], next: null };
   }
 }
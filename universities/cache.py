@@ -0,0 +1,75 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+CATALOG_VERSION_KEY = "universities:catalog-version"
+CATALOG_CHANGED_KEY = "universities:catalog-changed"
+
+
+def get_catalog_version():
+    """
+    Return the current catalog version.
+
+    The counter is seeded from the clock so that a cache flush or eviction
+    never brings back a version number that was handed out before.
+    """
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    # Replicas may not have the change yet; catalog reads stay on the
+    # primary until this marker expires (see edux.routers).
+    cache.set(CATALOG_CHANGED_KEY, True, settings.DB_REPLICA_STICKY_SECONDS)
+    try:
+        return cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(CATALOG_VERSION_KEY, version, None)
+        return version
+
+
+def catalog_recently_changed():
+    return cache.get(CATALOG_CHANGED_KEY, False)
+
+
+class CatalogCacheMixin:
+    """
+    Serve GET responses from a cache keyed by the catalog version.
+
+    Every response carries a strong ETag derived from the version and the
+    request, so a client that already holds the current page gets an empty
+    304 without touching the database or the serializers.
+    """
+
+    def get(self, request, *args, **kwargs):
+        version = get_catalog_version()
+        digest = hashlib.md5(
+            f"{request.build_absolute_uri()}|{request.accepted_media_type}".encode()
+        ).hexdigest()
+        etag = f'"{version}-{digest}"'
+
+        if etag in parse_etags(request.META.get("HTTP_IF_NONE_MATCH", "")):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            key = f"universities:response:{version}:{digest}"
+            data = cache.get(key)
+            if data is None:
+                response = super().get(request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                cache.set(key, response.data, settings.CATALOG_CACHE_TIMEOUT)
+            else:
+                response = Response(data)
+
+        response["ETag"] = etag
+        response["Cache-Control"] = "no-cache"
+        return response
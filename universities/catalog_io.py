@@ -0,0 +1,231 @@
+"""
+Streaming CSV/JSONL import and export of the university catalog.
+
+Rows are flat universities with their faculty and division names inlined:
+``faculties``/``divisions`` are JSON arrays in JSONL and ``|``-separated
+strings in CSV. Everything is processed in fixed-size chunks, so memory
+use does not depend on the size of the file.
+"""
+import csv
+import json
+import time
+from itertools import islice
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from edux.rows import LIST_SEPARATOR, RowError
+from .cache import bump_catalog_version
+from .models import Division, Faculty, University
+
+UNIVERSITY_FIELDS = ["name", "location", "established", "students", "ranking"]
+COLUMNS = ["id", *UNIVERSITY_FIELDS, "faculties", "divisions"]
+CHILDREN = {"faculties": Faculty, "divisions": Division}
+
+
+def text(value, field, model_field):
+    if not isinstance(value, str):
+        raise RowError(f"{field} must be a string")
+    value = value.strip()
+    if "\x00" in value:
+        raise RowError(f"{field} contains a NUL character")
+    if len(value) > model_field.max_length:
+        raise RowError(f"{field} is longer than {model_field.max_length} characters")
+    return value
+
+
+def integer(value, field, model_field):
+    # CSV carries numbers as strings; JSON must not sneak in floats or booleans.
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise RowError(f"{field} must be an integer")
+    try:
+        value = int(value)
+    except ValueError:
+        raise RowError(f"{field} must be an integer")
+    low, high = connection.ops.integer_field_range(model_field.get_internal_type())
+    if (low is not None and value < low) or (high is not None and value > high):
+        raise RowError(f"{field} must be between {low} and {high}")
+    return value
+
+
+def clean_row(row):
+    """
+    Validate a row against the model fields, raising RowError for
+    anything the database would reject.
+    """
+    if isinstance(row, RowError):
+        raise row
+    fields = University._meta
+    name = text(row.get("name") or "", "name", fields.get_field("name"))
+    if not name:
+        raise RowError("name is required")
+    cleaned = {"name": name}
+    if row.get("id") not in (None, ""):
+        cleaned["id"] = integer(row["id"], "id", fields.pk)
+    if row.get("location") is not None:
+        cleaned["location"] = text(row["location"], "location", fields.get_field("location"))
+    for field in ("established", "students", "ranking"):
+        if row.get(field) not in (None, ""):
+            cleaned[field] = integer(row[field], field, fields.get_field(field))
+    for key, model in CHILDREN.items():
+        if row.get(key) is not None:
+            if not isinstance(row[key], list):
+                raise RowError(f"{key} must be a list")
+            names = [text(name, f"{model._meta.verbose_name} name", model._meta.get_field("name")) for name in row[key]]
+            cleaned[key] = [name for name in names if name]
+    return cleaned
+
+
+def sync_children(model, wanted, created=()):
+    """
+    Make each university's children match ``wanted`` ({university_id: [names]}),
+    touching only the rows that differ. Universities in ``created`` are
+    known to have no children yet and are not looked up.
+    """
+    existing = {}
+    for pk, university_id, name in model.objects.filter(
+        university_id__in=[pk for pk in wanted if pk not in created],
+    ).values_list("pk", "university_id", "name"):
+        existing.setdefault((university_id, name), []).append(pk)
+
+    to_create = []
+    for university_id, names in wanted.items():
+        for name in names:
+            if existing.get((university_id, name)):
+                existing[(university_id, name)].pop()
+            else:
+                to_create.append(model(university_id=university_id, name=name))
+    stale = [pk for pks in existing.values() for pk in pks]
+    if stale:
+        model.objects.filter(pk__in=stale).delete()
+    model.objects.bulk_create(to_create)
+
+
+def import_chunk(rows):
+    ids = [row["id"] for row in rows if "id" in row]
+    existing = set(University.objects.filter(pk__in=ids).values_list("pk", flat=True))
+
+    to_update, to_create, update_fields = [], [], set()
+    for row in rows:
+        fields = {key: row[key] for key in UNIVERSITY_FIELDS if key in row}
+        if row.get("id") in existing:
+            update_fields.update(fields)
+            to_update.append((row, University(pk=row["id"], **fields)))
+        else:
+            to_create.append((row, University(pk=row.get("id"), **fields)))
+
+    if to_update:
+        # bulk_update writes every listed field, so a row that leaves a field
+        # out keeps the value already stored.
+        if any(update_fields - row.keys() for row, _ in to_update):
+            current = University.objects.in_bulk([obj.pk for _, obj in to_update])
+            for row, obj in to_update:
+                for field in update_fields - row.keys():
+                    setattr(obj, field, getattr(current[obj.pk], field))
+        if update_fields:
+            University.objects.bulk_update([obj for _, obj in to_update], sorted(update_fields))
+    University.objects.bulk_create([obj for _, obj in to_create])
+
+    created = {obj.pk for _, obj in to_create}
+    for key, model in CHILDREN.items():
+        wanted = {obj.pk: row[key] for row, obj in to_update + to_create if key in row}
+        if wanted:
+            sync_children(model, wanted, created)
+    return len(to_create), len(to_update)
+
+
+def import_catalog(rows, batch_size=2000, progress=None):
+    """
+    Upsert universities and their faculties/divisions from
+    ``(line_number, row)`` pairs.
+
+    Rows with an existing ``id`` are updated, everything else is created.
+    Each chunk of ``batch_size`` rows is one transaction; rows that fail
+    validation are skipped and reported by line instead of aborting the
+    import.
+    """
+    stats = {"created": 0, "updated": 0, "errors": []}
+    started = time.monotonic()
+    processed = 0
+    rows = iter(rows)
+    try:
+        while chunk := list(islice(rows, batch_size)):
+            valid, ids = [], set()
+            for line, row in chunk:
+                try:
+                    row = clean_row(row)
+                except RowError as exc:
+                    stats["errors"].append((line, str(exc)))
+                    continue
+                if "id" in row:
+                    if row["id"] in ids:
+                        stats["errors"].append((line, f"id {row['id']} appears earlier in the batch"))
+                        continue
+                    ids.add(row["id"])
+                valid.append(row)
+            with transaction.atomic():
+                created, updated = import_chunk(valid)
+            stats["created"] += created
+            stats["updated"] += updated
+            processed += len(chunk)
+            if progress:
+                progress(processed, processed / max(time.monotonic() - started, 1e-9))
+    finally:
+        # Chunks committed before a failure still need these.
+        if any(stats[key] for key in ("created", "updated")):
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(no_style(), [University]):
+                    cursor.execute(sql)
+            # Bulk writes bypass the model signals, so bump the version once here.
+            bump_catalog_version()
+    stats["rows"] = processed
+    stats["elapsed"] = time.monotonic() - started
+    return stats
+
+
+def iter_catalog(batch_size=2000):
+    """
+    Yield catalog rows in primary key order without loading the catalog
+    into memory.
+
+    Universities are read in keyset chunks of ``batch_size`` and their
+    children with one ``values_list`` query per chunk, skipping model
+    instantiation entirely.
+    """
+    last_pk = 0
+    while True:
+        chunk = list(
+            University.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", *UNIVERSITY_FIELDS)[:batch_size]
+        )
+        if not chunk:
+            return
+        ids = [values[0] for values in chunk]
+        children = {}
+        for key, model in CHILDREN.items():
+            names = children[key] = {}
+            for university_id, name in model.objects.filter(
+                university_id__in=ids,
+            ).order_by("pk").values_list("university_id", "name"):
+                names.setdefault(university_id, []).append(name)
+        for values in chunk:
+            row = dict(zip(["id", *UNIVERSITY_FIELDS], values))
+            for key in CHILDREN:
+                row[key] = children[key].get(row["id"], [])
+            yield row
+        last_pk = ids[-1]
+
+
+def write_rows(rows, stream, fmt):
+    if fmt == "csv":
+        writer = csv.DictWriter(stream, fieldnames=COLUMNS)
+        writer.writeheader()
+        for row in rows:
+            for key in CHILDREN:
+                row[key] = LIST_SEPARATOR.join(row[key])
+            writer.writerow(row)
+    else:
+        for row in rows:
+            stream.write(json.dumps(row, ensure_ascii=False))
+            stream.write("\n")
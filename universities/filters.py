@@ -0,0 +1,90 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchVector
+from django.db.models import Exists, OuterRef, Q
+from rest_framework import serializers
+from rest_framework.filters import BaseFilterBackend
+
+from .models import Faculty
+
+ORDERINGS = {
+    "ranking": ("ranking", "id"),
+    "-ranking": ("-ranking", "-id"),
+    "name": ("name", "id"),
+    "-name": ("-name", "-id"),
+    "established": ("established", "id"),
+    "-established": ("-established", "-id"),
+}
+
+
+class UniversityQuerySerializer(serializers.Serializer):
+    search = serializers.CharField(required=False, max_length=255)
+    name = serializers.CharField(required=False, max_length=255)
+    location = serializers.CharField(required=False, max_length=255)
+    faculty = serializers.CharField(required=False, max_length=255)
+    ranking_min = serializers.IntegerField(required=False)
+    ranking_max = serializers.IntegerField(required=False)
+    established_min = serializers.IntegerField(required=False)
+    established_max = serializers.IntegerField(required=False)
+    ordering = serializers.ChoiceField(choices=list(ORDERINGS), default="ranking")
+
+
+def prefix_search_query(text):
+    # "tech berl" -> 'tech:* & berl:*' so partially typed words still match.
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+    return SearchQuery(" & ".join(f"{word}:*" for word in words), config="simple", search_type="raw")
+
+
+class UniversityFilterBackend(BaseFilterBackend):
+    """
+    Server-side search, range filters and sort order for the catalog.
+
+    ``search`` is a full-text prefix match against the university name and
+    location or any of its faculty names; ``name``, ``location`` and
+    ``faculty`` are case-insensitive substring matches. Each is served by
+    the GIN tsvector/trigram indexes declared on the models.
+    """
+
+    def get_params(self, request):
+        serializer = UniversityQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+
+    def filter_queryset(self, request, queryset, view):
+        params = self.get_params(request)
+
+        if params.get("search"):
+            query = prefix_search_query(params["search"])
+            if query is None:
+                return queryset.none()
+            faculties = Faculty.objects.alias(
+                document=SearchVector("name", config="simple"),
+            ).filter(university=OuterRef("pk"), document=query)
+            queryset = queryset.alias(
+                document=SearchVector("name", "location", config="simple"),
+            ).filter(Q(document=query) | Exists(faculties))
+
+        if params.get("name"):
+            queryset = queryset.filter(name__icontains=params["name"])
+        if params.get("location"):
+            queryset = queryset.filter(location__icontains=params["location"])
+        if params.get("faculty"):
+            queryset = queryset.filter(Exists(Faculty.objects.filter(
+                university=OuterRef("pk"), name__icontains=params["faculty"],
+            )))
+
+        if "ranking_min" in params:
+            queryset = queryset.filter(ranking__gte=params["ranking_min"])
+        if "ranking_max" in params:
+            queryset = queryset.filter(ranking__lte=params["ranking_max"])
+        if "established_min" in params:
+            queryset = queryset.filter(established__gte=params["established_min"])
+        if "established_max" in params:
+            queryset = queryset.filter(established__lte=params["established_max"])
+        return queryset
+
+    def get_ordering(self, request, queryset, view):
+        # Picked up by CursorPagination, which keys its cursor on this order.
+        return ORDERINGS[self.get_params(request)["ordering"]]
@@ -0,0 +1,149 @@
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection
+from PIL import ExifTags, Image, ImageOps
+
+from .cache import bump_catalog_version
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "jpeg": {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True},
+}
+
+_executor = None
+
+
+def variant_fields(model):
+    """
+    Return ``(image_field, variants_field)`` for a model with derivatives.
+    """
+    from .models import Gallery, University
+
+    return {
+        University: ("thumbnail", "thumbnail_variants"),
+        Gallery: ("image", "image_variants"),
+    }.get(model)
+
+
+def render_variants(field_file):
+    """
+    Resize ``field_file`` to every configured width and encode each size
+    as WebP and JPEG. Returns the metadata stored in the variants field.
+    """
+    widths = sorted(settings.IMAGE_VARIANT_WIDTHS)
+    storage = field_file.storage
+    stem, _ = posixpath.splitext(field_file.name)
+    directory, basename = posixpath.split(stem)
+
+    with field_file.open("rb"), Image.open(field_file) as original:
+        # Full-size dimensions as displayed: draft() below shrinks .size,
+        # and orientations 5-8 swap width and height when transposed.
+        source_width, source_height = original.size
+        if original.getexif().get(ExifTags.Base.Orientation) in (5, 6, 7, 8):
+            source_width, source_height = source_height, source_width
+        # Let the JPEG decoder downscale while decoding; far cheaper than a
+        # full-size decode followed by a resize.
+        original.draft("RGB", (widths[-1], widths[-1]))
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+        variants = []
+        # Never upscale: widths above the original collapse onto it.
+        targets = sorted({min(width, image.width) for width in widths})
+        for width in targets:
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.LANCZOS) if width != image.width else image
+            for name, options in FORMATS.items():
+                frame = resized.convert("RGB") if name == "jpeg" and resized.mode != "RGB" else resized
+                buffer = BytesIO()
+                frame.save(buffer, **options)
+                path = posixpath.join(directory, "variants", f"{basename}-{width}w.{name}")
+                if storage.exists(path):
+                    storage.delete(path)
+                path = storage.save(path, ContentFile(buffer.getvalue()))
+                variants.append({"name": path, "format": name, "width": width, "height": height})
+
+    return {
+        "source": field_file.name,
+        "width": source_width,
+        "height": source_height,
+        "variants": variants,
+    }
+
+
+def delete_variants(storage, data):
+    for variant in data.get("variants", []):
+        storage.delete(variant["name"])
+
+
+def generate_variants(model, pk):
+    """
+    Build derivatives for one row and store them on it.
+
+    The row is updated with ``QuerySet.update`` guarded on the source file
+    name, so a newer upload that raced this job is never overwritten.
+    """
+    image_field, variants_field = variant_fields(model)
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return
+    field_file = getattr(instance, image_field)
+    previous = getattr(instance, variants_field) or {}
+
+    if not field_file:
+        if previous:
+            model.objects.filter(pk=pk).update(**{variants_field: {}})
+            delete_variants(field_file.storage, previous)
+            bump_catalog_version()
+        return
+
+    data = render_variants(field_file)
+    updated = model.objects.filter(pk=pk, **{image_field: field_file.name}).update(
+        **{variants_field: data}
+    )
+    if not updated:
+        delete_variants(field_file.storage, data)
+        return
+    if previous.get("source") != data["source"]:
+        delete_variants(field_file.storage, previous)
+    bump_catalog_version()
+
+
+def _run_job(model, pk):
+    try:
+        generate_variants(model, pk)
+    except Exception:
+        logger.exception("Failed to build image variants for %s %s", model.__name__, pk)
+
+
+def _run_pooled_job(model, pk):
+    try:
+        _run_job(model, pk)
+    finally:
+        # Pool threads hold their own connection; do not leak it.
+        connection.close()
+
+
+def schedule_variants(model, pk):
+    """
+    Queue derivative generation on the worker pool, or run it inline when
+    ``IMAGE_VARIANT_WORKERS`` is 0.
+    """
+    global _executor
+    if not settings.IMAGE_VARIANT_WORKERS:
+        _run_job(model, pk)
+        return
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.IMAGE_VARIANT_WORKERS,
+            thread_name_prefix="image-variants",
+        )
+    _executor.submit(_run_pooled_job, model, pk)
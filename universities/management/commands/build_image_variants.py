@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from universities.images import generate_variants, variant_fields
+from universities.models import Gallery, University
+
+
+class Command(BaseCommand):
+    help = "Build resized WebP/JPEG variants for university thumbnails and gallery images."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Rebuild variants even when they are already up to date.",
+        )
+
+    def handle(self, *args, **options):
+        for model in (University, Gallery):
+            image_field, variants_field = variant_fields(model)
+            built = 0
+            rows = model.objects.exclude(**{image_field: ""}).exclude(**{f"{image_field}__isnull": True})
+            for pk, name, variants in rows.values_list("pk", image_field, variants_field).iterator():
+                if options["force"] or (variants or {}).get("source") != name:
+                    generate_variants(model, pk)
+                    built += 1
+            self.stdout.write(f"{model.__name__}: built variants for {built} image(s)")
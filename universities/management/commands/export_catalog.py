@@ -0,0 +1,38 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from edux.rows import detect_format
+from universities.catalog_io import iter_catalog, write_rows
+
+
+class Command(BaseCommand):
+    help = "Stream universities with their faculties and divisions out to a CSV or JSONL file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to write, or - for stdout.")
+        parser.add_argument("--format", choices=["csv", "jsonl"], help="Defaults to the file extension.")
+        parser.add_argument("--batch-size", type=int, default=2000, help="Rows fetched per query.")
+
+    def handle(self, *args, **options):
+        fmt = detect_format(options["path"], options["format"])
+        started = time.monotonic()
+        count = 0
+
+        def rows():
+            nonlocal count
+            for row in iter_catalog(options["batch_size"]):
+                count += 1
+                yield row
+
+        if options["path"] == "-":
+            write_rows(rows(), sys.stdout, fmt)
+        else:
+            with open(options["path"], "w", newline="", encoding="utf-8") as stream:
+                write_rows(rows(), stream, fmt)
+
+        elapsed = time.monotonic() - started
+        self.stderr.write(self.style.SUCCESS(
+            f"{count} rows in {elapsed:.2f}s ({count / max(elapsed, 1e-9):.0f} rows/s)"
+        ))
@@ -0,0 +1,35 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from edux.rows import detect_format, read_rows
+from universities.catalog_io import CHILDREN, import_catalog
+
+
+class Command(BaseCommand):
+    help = "Stream universities with their faculties and divisions in from a CSV or JSONL file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to read, or - for stdin.")
+        parser.add_argument("--format", choices=["csv", "jsonl"], help="Defaults to the file extension.")
+        parser.add_argument("--batch-size", type=int, default=2000, help="Rows per transaction.")
+
+    def handle(self, *args, **options):
+        fmt = detect_format(options["path"], options["format"])
+
+        def progress(rows, rate):
+            self.stdout.write(f"{rows} rows ({rate:.0f} rows/s)")
+
+        if options["path"] == "-":
+            stats = import_catalog(read_rows(sys.stdin, fmt, lists=CHILDREN), options["batch_size"], progress)
+        else:
+            with open(options["path"], newline="", encoding="utf-8") as stream:
+                stats = import_catalog(read_rows(stream, fmt, lists=CHILDREN), options["batch_size"], progress)
+
+        for line, error in stats["errors"]:
+            self.stderr.write(f"row {line}: {error}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats['rows']} rows in {stats['elapsed']:.2f}s "
+            f"({stats['rows'] / max(stats['elapsed'], 1e-9):.0f} rows/s): "
+            f"{stats['created']} created, {stats['updated']} updated, {len(stats['errors'])} skipped"
+        ))
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:26
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.operations
+import django.contrib.postgres.search
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('universities', '0004_alter_gallery_image_alter_university_thumbnail'),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.TrigramExtension(),
+        migrations.AddIndex(
+            model_name='faculty',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('name'), name='gin_trgm_ops'), name='faculty_name_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='faculty',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('name', config='simple'), name='faculty_search_vector'),
+        ),
+        migrations.AddIndex(
+            model_name='university',
+            index=models.Index(fields=['ranking', 'id'], name='university_ranking_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='university',
+            index=models.Index(fields=['name', 'id'], name='university_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='university',
+            index=models.Index(fields=['established', 'id'], name='university_established_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='university',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('name'), name='gin_trgm_ops'), name='university_name_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='university',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('location'), name='gin_trgm_ops'), name='university_location_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='university',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('name', 'location', config='simple'), name='university_search_vector'),
+        ),
+    ]
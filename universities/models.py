@@ -1,4 +1,7 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector
 from django.db import models
+from django.db.models.functions import Upper
 
 
 class University(models.Model):
@@ -8,12 +11,30 @@ class University(models.Model):
     established = models.IntegerField(default=1625)
     students = models.IntegerField(default=4892)
     ranking = models.IntegerField(default=3)
+    thumbnail_variants = models.JSONField(default=dict, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["ranking", "id"], name="university_ranking_idx"),
+            models.Index(fields=["name", "id"], name="university_name_idx"),
+            models.Index(fields=["established", "id"], name="university_established_idx"),
+            # icontains compiles to UPPER(col) LIKE UPPER(%s), hence the Upper().
+            GinIndex(OpClass(Upper("name"), name="gin_trgm_ops"), name="university_name_trgm"),
+            GinIndex(OpClass(Upper("location"), name="gin_trgm_ops"), name="university_location_trgm"),
+            GinIndex(SearchVector("name", "location", config="simple"), name="university_search_vector"),
+        ]
 
 
 class Faculty(models.Model):
     name = models.CharField(max_length=255)
     university = models.ForeignKey(University, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            GinIndex(OpClass(Upper("name"), name="gin_trgm_ops"), name="faculty_name_trgm"),
+            GinIndex(SearchVector("name", config="simple"), name="faculty_search_vector"),
+        ]
+
 
 class Division(models.Model):
     name = models.CharField(max_length=255)
@@ -22,4 +43,5 @@ class Division(models.Model):
 
 class Gallery(models.Model):
     image = models.ImageField(upload_to='images/', blank=True, null=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     university = models.ForeignKey(University, on_delete=models.CASCADE)
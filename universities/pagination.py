@@ -0,0 +1,115 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.db import connection
+from django.db.models import BooleanField, CharField, IntegerField
+from django.db.models.expressions import RawSQL
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class UniversityCursorPagination(CursorPagination):
+    """
+    Keyset pagination over the catalog, ordered by ``ranking`` then ``id``
+    or another ``(field, id)`` order from the filter backend.
+
+    The cursor holds the sort key of the last (or, going back, the first)
+    row shown, and the next page starts with a row comparison such as
+    ``(ranking, id) > (3, 42)``. That is a range scan on the matching
+    ``(field, id)`` index, so deep pages cost the same as the first one
+    even when most rows share a ranking. DRF's own cursor falls back to an
+    offset for such ties.
+
+    Query budget per page is constant no matter how large the catalog is:
+    a single query returns the page of universities together with their
+    faculty counts.
+    """
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("ranking", "id")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.fields = [field.lstrip("-") for field in self.ordering]
+        self.model = queryset.model
+        descending = self.ordering[0].startswith("-")
+
+        cursor = self.decode_cursor(request)
+        backwards = cursor is not None and cursor["back"]
+        if cursor is not None:
+            # Going back walks the index in the opposite direction.
+            operator = "<" if descending != backwards else ">"
+            queryset = queryset.filter(self.after(queryset.model, operator, cursor["key"]))
+        order = self.ordering
+        if backwards:
+            order = [field[1:] if field.startswith("-") else f"-{field}" for field in order]
+
+        rows = list(queryset.order_by(*order)[:self.page_size + 1])
+        more = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        if backwards:
+            self.page.reverse()
+        self.has_next = more if not backwards else True
+        self.has_previous = (cursor is not None) if not backwards else more
+        return self.page
+
+    def after(self, model, operator, key):
+        quote = connection.ops.quote_name
+        table = quote(model._meta.db_table)
+        columns = ", ".join(f"{table}.{quote(model._meta.get_field(field).column)}" for field in self.fields)
+        placeholders = ", ".join(["%s"] * len(key))
+        return RawSQL(f"({columns}) {operator} ({placeholders})", key, output_field=BooleanField())
+
+    def key_of(self, row):
+        return [getattr(row, field) for field in self.fields]
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+            if not isinstance(cursor, dict) or not isinstance(cursor["key"], list):
+                raise ValueError
+            if len(cursor["key"]) != len(self.fields):
+                raise ValueError
+            for field, value in zip(self.fields, cursor["key"]):
+                self.check_key(self.model._meta.get_field(field), value)
+            cursor["back"] = bool(cursor.get("back"))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def check_key(self, field, value):
+        # A tampered key must not reach the SQL as the wrong type.
+        if isinstance(field, IntegerField):
+            valid = isinstance(value, int) and not isinstance(value, bool)
+        elif isinstance(field, CharField):
+            valid = isinstance(value, str)
+        else:
+            valid = False
+        if not valid:
+            raise ValueError
+
+    def encode_cursor(self, cursor):
+        encoded = urlsafe_b64encode(json.dumps(cursor).encode()).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor({"key": self.key_of(self.page[-1])})
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor({"key": self.key_of(self.page[0]), "back": True})
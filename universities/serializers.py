@@ -1,7 +1,93 @@
-from rest_framework import serializers
+from rest_framework import permissions, serializers
+from edux.metrics import TimedSerializerMixin
 from .models import University, Faculty, Division, Gallery
 
 
+def requested_fields(request):
+    """
+    Return the field names asked for with ``?fields=a,b`` on a read
+    request, or None when every field should be rendered.
+    """
+    if request is None or request.method not in permissions.SAFE_METHODS:
+        return None
+    value = request.query_params.get("fields")
+    if not value:
+        return None
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+class SparseFieldsMixin:
+    """
+    Drop every field not listed in the request's ``?fields=`` parameter.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = requested_fields(self.context.get("request"))
+        if fields is not None:
+            for name in set(self.fields) - fields:
+                self.fields.pop(name)
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """
+    Render stored image derivatives as a per-format map of URLs with a
+    ready-made ``srcset`` string, e.g. ``{"webp": {"srcset": ..., "images": [...]}}``.
+    """
+
+    def __init__(self, image_field, **kwargs):
+        self.image_field = image_field
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        request = self.context.get("request")
+        storage = self.parent.Meta.model._meta.get_field(self.image_field).storage
+        formats = {}
+        for variant in (value or {}).get("variants", []):
+            url = storage.url(variant["name"])
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            formats.setdefault(variant["format"], []).append(
+                {"url": url, "width": variant["width"], "height": variant["height"]}
+            )
+        return {
+            name: {
+                "srcset": ", ".join(f"{image['url']} {image['width']}w" for image in images),
+                "images": images,
+            }
+            for name, images in formats.items()
+        }
+
+
+class SummaryThumbnailField(serializers.Field):
+    """
+    A single thumbnail URL: the WebP variant closest to ``width`` when
+    derivatives exist, otherwise the original upload.
+    """
+
+    def __init__(self, width=640, **kwargs):
+        self.width = width
+        kwargs["source"] = "*"
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, university):
+        variants = [
+            variant for variant in (university.thumbnail_variants or {}).get("variants", [])
+            if variant["format"] == "webp"
+        ]
+        if variants:
+            # Smallest variant at least `width` wide, else the largest one.
+            best = min(variants, key=lambda v: (v["width"] < self.width, abs(v["width"] - self.width)))
+            url = university.thumbnail.storage.url(best["name"])
+        elif university.thumbnail:
+            url = university.thumbnail.url
+        else:
+            return None
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request is not None else url
+
+
 class FacultySerializer(serializers.ModelSerializer):
     class Meta:
         model = Faculty
@@ -16,16 +102,18 @@ class DivisionSerializer(serializers.ModelSerializer):
 
 class GallerySerializer(serializers.ModelSerializer):
     image = serializers.ImageField(use_url=True)  # ensures URL is returned
+    image_variants = ImageVariantsField("image")
 
     class Meta:
         model = Gallery
-        fields = ["id", "image"]
+        fields = ["id", "image", "image_variants"]
 
 
-class UniversitySerializer(serializers.ModelSerializer):
+class UniversitySerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     faculties = FacultySerializer(many=True, read_only=True, source="faculty_set")
     divisions = DivisionSerializer(many=True, read_only=True, source="division_set")
     gallery = GallerySerializer(many=True, read_only=True, source="gallery_set")
+    thumbnail_variants = ImageVariantsField("thumbnail")
 
     class Meta:
         model = University
@@ -33,6 +121,7 @@ class UniversitySerializer(serializers.ModelSerializer):
             "id",
             "name",
             "thumbnail",
+            "thumbnail_variants",
             "location",
             "established",
             "students",
@@ -41,3 +130,25 @@ class UniversitySerializer(serializers.ModelSerializer):
             "divisions",
             "gallery",
         ]
+
+
+class UniversitySummarySerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Flat representation for catalog listings; the nested faculty, division
+    and gallery graph is only rendered by the detail endpoint.
+    """
+    thumbnail = SummaryThumbnailField()
+    faculty_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = University
+        fields = [
+            "id",
+            "name",
+            "thumbnail",
+            "location",
+            "established",
+            "students",
+            "ranking",
+            "faculty_count",
+        ]
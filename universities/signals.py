@@ -0,0 +1,28 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .cache import bump_catalog_version
+from .images import schedule_variants, variant_fields
+from .models import Division, Faculty, Gallery, University
+
+
+def catalog_changed(sender, **kwargs):
+    # Bump only once the change is visible to other connections, otherwise a
+    # concurrent request could cache the old rows under the new version.
+    transaction.on_commit(bump_catalog_version)
+
+
+def image_saved(sender, instance, **kwargs):
+    image_field, variants_field = variant_fields(sender)
+    field_file = getattr(instance, image_field)
+    variants = getattr(instance, variants_field) or {}
+    if (field_file.name or None) != variants.get("source"):
+        transaction.on_commit(lambda: schedule_variants(sender, instance.pk))
+
+
+for model in (University, Faculty, Division, Gallery):
+    post_save.connect(catalog_changed, sender=model)
+    post_delete.connect(catalog_changed, sender=model)
+
+for model in (University, Gallery):
+    post_save.connect(image_saved, sender=model)
@@ -1,3 +1,108 @@
+import io
+import json
+from base64 import urlsafe_b64encode
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from edux.rows import read_rows
+from .catalog_io import CHILDREN, import_catalog
+from .filters import ORDERINGS
+from .models import University
+
+
+def cursor(data):
+    return urlsafe_b64encode(json.dumps(data).encode()).decode("ascii")
+
+
+class UniversityPaginationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Rankings, names and years are heavily tied so pages split ties.
+        for i, (ranking, name, established) in enumerate([
+            (1, "Beta", 1900), (2, "Alpha", 1800), (2, "Alpha", 1900),
+            (2, "Gamma", 1800), (2, "Beta", 1700), (3, "Alpha", 1900),
+            (3, "Delta", 1800),
+        ]):
+            University.objects.create(name=name, location=f"City {i}", ranking=ranking, established=established)
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("university-list")
+
+    def get(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data
+
+    def expected(self, ordering):
+        return list(University.objects.order_by(*ORDERINGS[ordering]).values_list("id", flat=True))
+
+    def test_forward_and_backward_paging_for_every_ordering(self):
+        for ordering in ORDERINGS:
+            with self.subTest(ordering=ordering):
+                pages = [self.get(self.url, ordering=ordering, page_size=2)]
+                self.assertIsNone(pages[0]["previous"])
+                while pages[-1]["next"]:
+                    pages.append(self.get(pages[-1]["next"]))
+                ids = [row["id"] for page in pages for row in page["results"]]
+                self.assertEqual(ids, self.expected(ordering))
+
+                # Walk back from the last page to the first.
+                back = [pages[-1]]
+                while back[-1]["previous"]:
+                    back.append(self.get(back[-1]["previous"]))
+                self.assertEqual(
+                    [[row["id"] for row in page["results"]] for page in back],
+                    [[row["id"] for row in page["results"]] for page in reversed(pages)],
+                )
+
+    def test_page_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            self.get(self.url, page_size=2)
+
+    def test_invalid_cursor_is_rejected(self):
+        for value in [
+            "not-base64!",
+            cursor([1, 2]),
+            cursor({"back": True}),
+            cursor({"key": [1]}),
+            cursor({"key": [1, 2, 3]}),
+            cursor({"key": [{"x": 1}, 2]}),
+            cursor({"key": ["abc", 1]}),
+            cursor({"key": [True, 1]}),
+            cursor({"key": "ab"}),
+        ]:
+            with self.subTest(cursor=value):
+                response = self.client.get(self.url, {"cursor": value})
+                self.assertEqual(response.status_code, 404)
+
+    def test_cursor_key_types_follow_the_ordering(self):
+        response = self.client.get(self.url, {"ordering": "name", "cursor": cursor({"key": [1, 1]})})
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(self.url, {"ordering": "name", "cursor": cursor({"key": ["Beta", 1]})})
+        self.assertEqual(response.status_code, 200)
+
 
-# Create your tests here.
+class ImportCatalogTests(TestCase):
+    def test_rows_are_validated_against_the_model(self):
+        rows = [
+            {"name": 5},
+            {"name": "x" * 256},
+            {"name": "Bad", "location": ["a"]},
+            {"name": "Bad", "location": "y" * 256},
+            {"name": "Bad", "faculties": ["f" * 256]},
+            {"name": "Bad", "divisions": [{"name": "d"}]},
+            {"name": "Bad", "ranking": "99999999999"},
+            {"name": "Bad", "students": 1.5},
+            {"name": "Good", "ranking": "7", "faculties": ["Law", "Art"]},
+        ]
+        stream = io.StringIO("\n".join(json.dumps(row) for row in rows))
+        stats = import_catalog(read_rows(stream, "jsonl", lists=CHILDREN))
+        self.assertEqual(stats["created"], 1)
+        self.assertEqual([line for line, _ in stats["errors"]], list(range(1, 9)))
+        university = University.objects.get()
+        self.assertEqual((university.name, university.ranking), ("Good", 7))
+        self.assertEqual(sorted(university.faculty_set.values_list("name", flat=True)), ["Art", "Law"])
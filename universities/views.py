@@ -1,12 +1,52 @@
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from rest_framework import generics, permissions
 from rest_framework.response import Response
-from .models import University
-from .serializers import UniversitySerializer
+from .cache import CatalogCacheMixin
+from .filters import UniversityFilterBackend
+from .models import Faculty, University
+from .pagination import UniversityCursorPagination
+from .serializers import UniversitySerializer, UniversitySummarySerializer, requested_fields
 
+NESTED_RELATIONS = {
+    "faculties": "faculty_set",
+    "divisions": "division_set",
+    "gallery": "gallery_set",
+}
+
+
+def university_queryset(fields=None):
+    # Nested relations are loaded with one query each instead of one query
+    # per university, and skipped entirely when ?fields= leaves them out.
+    return University.objects.prefetch_related(*[
+        lookup for name, lookup in NESTED_RELATIONS.items()
+        if fields is None or name in fields
+    ])
+
+
+def faculty_count():
+    # A correlated subquery is only evaluated for the rows on the page,
+    # unlike a JOIN + GROUP BY over the whole filtered catalog.
+    return Coalesce(Subquery(
+        Faculty.objects.filter(university=OuterRef("pk"))
+        .order_by()
+        .values("university")
+        .annotate(count=Count("pk"))
+        .values("count"),
+        output_field=IntegerField(),
+    ), 0)
 
-class UniversityListCreateView(generics.ListCreateAPIView):
-    queryset = University.objects.all()
-    serializer_class = UniversitySerializer
+
+class UniversityListCreateView(CatalogCacheMixin, generics.ListCreateAPIView):
+    queryset = University.objects.annotate(faculty_count=faculty_count())
+    serializer_class = UniversitySummarySerializer
+    pagination_class = UniversityCursorPagination
+    filter_backends = [UniversityFilterBackend]
+
+    def get_serializer_class(self):
+        if self.request.method == "POST":
+            return UniversitySerializer
+        return UniversitySummarySerializer
 
     def get_permissions(self):
         if self.request.method == "POST":
@@ -14,10 +54,12 @@ class UniversityListCreateView(generics.ListCreateAPIView):
         return [permissions.AllowAny()]
 
 
-class UniversityDetailView(generics.RetrieveUpdateAPIView):
-    queryset = University.objects.all()
+class UniversityDetailView(CatalogCacheMixin, generics.RetrieveUpdateAPIView):
     serializer_class = UniversitySerializer
 
+    def get_queryset(self):
+        return university_queryset(requested_fields(self.request))
+
     def get_permissions(self):
         if self.request.method in ["PUT", "PATCH"]:
             return [permissions.IsAdminUser()]